@@ -0,0 +1,73 @@
+"""
+Compares the time it takes to parse saved box score pages by parsing whole documents,
+like the crawlers used to, and by extracting only the elements they need.
+
+    uv run benchmarks/html_parsing.py path/to/boxscores/*.html
+"""
+
+import argparse
+import time
+from functools import partial
+from pathlib import Path
+
+from hockey_pool_picker.sources.games.hockey_reference import HockeyReferenceGamesSource
+from hockey_pool_picker.sources.parsing import PARSER, DocumentPage, Page
+
+FIXTURES = (
+    Path(__file__).parent.parent
+    / "test"
+    / "fixtures"
+    / "hockey_reference"
+    / "boxscores"
+)
+
+
+def benchmark(pages, repeat):
+    contents = [page.read_bytes() for page in pages]
+
+    page_classes = {"document (html.parser)": DocumentPage}
+    if PARSER != "html.parser":
+        page_classes[f"document ({PARSER})"] = partial(DocumentPage, parser=PARSER)
+    page_classes[f"targeted ({PARSER})"] = Page
+
+    expected = None
+    for name, page_class in page_classes.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            games = [
+                HockeyReferenceGamesSource._parse_game(content, page_class)
+                for content in contents
+            ]
+        elapsed = time.perf_counter() - start
+
+        if expected is None:
+            expected = games
+        assert games == expected, f"{name} parsed games differently"
+
+        per_page = elapsed / (repeat * len(contents)) * 1000
+        print(f"{name:<24} {elapsed:8.3f}s  {per_page:8.3f}ms per page")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark parsing saved hockey-reference box score pages."
+    )
+    parser.add_argument(
+        "pages",
+        nargs="*",
+        type=Path,
+        default=sorted(FIXTURES.glob("*.html")),
+        help="Saved box score pages. Defaults to the test fixtures.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=20,
+        help="Number of times every page is parsed.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    benchmark(args.pages, args.repeat)
@@ -0,0 +1,278 @@
+"""
+Times the paths backtests run nightly on a generated league, so that they can be
+compared with a baseline report instead of crawled data:
+
+    uv run benchmarks/suite.py --output report.json
+    uv run benchmarks/suite.py --baseline report.json
+
+The league is generated in a temporary folder unless --data_dir is given. Exits with
+an error when a benchmark's median time regressed past the tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from hockey_pool_picker.sources.data_dir import ENVIRONMENT_VARIABLE
+
+FIXTURES = Path(__file__).parent.parent / "test" / "fixtures" / "hockey_reference"
+REPORT_VERSION = 1
+
+
+def measure(function, repeat, setup=None):
+    """
+    :param setup: called before every run, without being timed
+    :return: the duration of every run, in seconds
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run(league, season_start, repeat, trades_count, solver_workers, pages, schedule):
+    # imported once the data folder is set
+    from hockey_pool_picker.core.season import SEASONS_CAP_HIT, Season
+    from hockey_pool_picker.core.season_simulator import SeasonSimulator
+    from hockey_pool_picker.core.solver import CPSATSolver
+    from hockey_pool_picker.core.stats_index import DailyStatsIndex
+    from hockey_pool_picker.core.strategy import MarqueurValueStrategy
+    from hockey_pool_picker.sources import season_cache
+    from hockey_pool_picker.sources.backtest import BacktestingSource
+    from hockey_pool_picker.sources.games.hockey_reference import (
+        HockeyReferenceGamesSource,
+    )
+    from hockey_pool_picker.sources.players import PlayersSource
+
+    season = Season(start=season_start)
+    salary_cap = SEASONS_CAP_HIT[season_start]
+    strategy = MarqueurValueStrategy()
+    solver = CPSATSolver(num_workers=solver_workers)
+
+    times = {}
+    state = {}
+
+    def load():
+        source = BacktestingSource(season, PlayersSource)
+        state["pools"] = source.load(strategy, strategy)
+
+    # files are read again every time, from their binary caches like nightly runs
+    times["backtesting_source_load"] = measure(
+        load, repeat, setup=season_cache.invalidate
+    )
+    past_pool, present_pool = state["pools"]
+
+    def pick_pool():
+        state["solution"] = solver.pick_pool(past_pool, salary_cap)
+
+    times["pick_pool"] = measure(pick_pool, repeat)
+    solution = state["solution"]
+
+    times["pick_trades"] = measure(
+        lambda: solver.pick_trades(solution, present_pool, salary_cap, trades_count),
+        repeat,
+    )
+
+    games = HockeyReferenceGamesSource(season).load()
+
+    def build_stats_index():
+        state["stats_index"] = DailyStatsIndex(games)
+
+    times["stats_index"] = measure(build_stats_index, repeat)
+
+    def progress():
+        SeasonSimulator(
+            solver,
+            season,
+            present_pool,
+            salary_cap,
+            strategy,
+            strategy,
+            trades_count=trades_count,
+            stats_index=state["stats_index"],
+            verbose=False,
+        ).progress(solution)
+
+    times["season_simulator_progress"] = measure(progress, repeat)
+
+    contents = [page.read_bytes() for page in pages]
+    times["parse_box_scores"] = measure(
+        lambda: [HockeyReferenceGamesSource._parse_game(c) for c in contents], repeat
+    )
+    schedule_content = schedule.read_bytes()
+    times["parse_schedule"] = measure(
+        lambda: HockeyReferenceGamesSource(season)._game_links(schedule_content),
+        repeat,
+    )
+
+    return {
+        "version": REPORT_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "league": league,
+        "season": season_start,
+        "benchmarks": {
+            name: {
+                "times": durations,
+                "min": min(durations),
+                "median": statistics.median(durations),
+                "mean": statistics.mean(durations),
+            }
+            for name, durations in times.items()
+        },
+    }
+
+
+def compare(report, baseline, tolerance):
+    """
+    Prints every benchmark's median against the baseline's.
+    :return: the names of benchmarks slower than the baseline by more than tolerance
+    """
+    regressions = []
+    print(f"{'benchmark':<28} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, result in report["benchmarks"].items():
+        if name not in baseline["benchmarks"]:
+            print(f"{name:<28} {'-':>10} {result['median']:>9.4f}s")
+            continue
+
+        before = baseline["benchmarks"][name]["median"]
+        ratio = result["median"] / before
+        regressed = ratio > 1 + tolerance
+        if regressed:
+            regressions.append(name)
+        print(
+            f"{name:<28} {before:>9.4f}s {result['median']:>9.4f}s {ratio:>6.2f}x"
+            + ("  REGRESSED" if regressed else "")
+        )
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark loading, solving, simulating and parsing on a "
+        "generated league."
+    )
+    parser.add_argument(
+        "--data_dir",
+        type=Path,
+        help="Folder to generate the league in. Defaults to a temporary folder.",
+    )
+    parser.add_argument("--forwards", type=int, default=400)
+    parser.add_argument("--defenders", type=int, default=200)
+    parser.add_argument("--goalies", type=int, default=70)
+    parser.add_argument(
+        "--games", type=int, default=1312, help="Games played every season."
+    )
+    parser.add_argument(
+        "--cap_median",
+        type=int,
+        default=1_500_000,
+        help="Median cap hit of the log-normal distribution of cap hits.",
+    )
+    parser.add_argument(
+        "--cap_sigma",
+        type=float,
+        default=0.9,
+        help="Standard deviation of the cap hits' logarithm.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--season",
+        type=int,
+        default=2022,
+        help="Past season of the backtest, its next season is generated too.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--trades_count", type=int, default=5)
+    parser.add_argument(
+        "--solver_workers",
+        type=int,
+        default=1,
+        help="CP-SAT workers. A single one keeps times comparable across machines.",
+    )
+    parser.add_argument(
+        "--pages",
+        nargs="*",
+        type=Path,
+        default=sorted((FIXTURES / "boxscores").glob("*.html")),
+        help="Saved box score pages to parse. Defaults to the test fixtures.",
+    )
+    parser.add_argument(
+        "--schedule",
+        type=Path,
+        default=FIXTURES / "leagues" / "NHL_2023_games.html",
+        help="Saved schedule page to parse. Defaults to the test fixture.",
+    )
+    parser.add_argument("--output", type=Path, help="File to write the report to.")
+    parser.add_argument(
+        "--baseline", type=Path, help="Report to compare the results with."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Slowdown of a median time over the baseline's reported as a regression.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    league = {
+        "forwards": args.forwards,
+        "defenders": args.defenders,
+        "goalies": args.goalies,
+        "games": args.games,
+        "cap_median": args.cap_median,
+        "cap_sigma": args.cap_sigma,
+        "seed": args.seed,
+    }
+
+    with tempfile.TemporaryDirectory() as temporary_dir:
+        data_dir = args.data_dir or Path(temporary_dir)
+        # every source reads from the generated league from now on
+        os.environ[ENVIRONMENT_VARIABLE] = str(data_dir)
+
+        from hockey_pool_picker.sources.synthetic import SyntheticLeague
+
+        SyntheticLeague(**league).write(data_dir, [args.season, args.season + 1])
+        report = run(
+            league,
+            args.season,
+            args.repeat,
+            args.trades_count,
+            args.solver_workers,
+            args.pages,
+            args.schedule,
+        )
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.baseline is None:
+        for name, result in report["benchmarks"].items():
+            print(f"{name:<28} {result['median']:>9.4f}s")
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline["league"] != report["league"]:
+        print("The baseline was measured on another league, times may not compare")
+    if compare(report, baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,351 @@
 import argparse
+import calendar
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
 
+import pandas as pd
+
+from hockey_pool_picker import profiling
+from hockey_pool_picker.profiling import add_profile_argument, profiled
+from hockey_pool_picker.run_store import (
+    add_store_arguments,
+    run_store,
+    simulation_record,
+)
+from hockey_pool_picker.core.monte_carlo import MonteCarloSeason
 from hockey_pool_picker.core.season import Season, SEASONS_CAP_HIT
-from hockey_pool_picker.core.season_simulator import SeasonSimulator
+from hockey_pool_picker.core.season_simulator import PERIOD_MONTHS, SeasonSimulator
+from hockey_pool_picker.core.stats_index import DailyStatsIndex
 from hockey_pool_picker.sources.backtest import BacktestingSource
 from hockey_pool_picker.core.strategy import (
     STRATEGIES,
+    evaluate_strategies,
+)
+from hockey_pool_picker.core.solver import SOLVERS
+from hockey_pool_picker.solver_arguments import (
+    add_solver_parameters_arguments,
+    check_solver_parameters,
+    solver_parameters,
 )
-from hockey_pool_picker.core.solver import CPSATSolver
+from hockey_pool_picker.sources.games.hockey_reference import HockeyReferenceGamesSource
 from hockey_pool_picker.sources.players import PlayersSource
+from hockey_pool_picker.util import PLAYER_TYPES
 
 
-def backtest(season_start=2022, evaluation_strategy='marqueur', picking_strategy='marqueur', period_strategy='marqueur'):
+def backtest(
+    season_start=2022,
+    evaluation_strategy="marqueur",
+    picking_strategy="marqueur",
+    period_strategy="marqueur",
+    trades_count=5,
+    solver="cpsat",
+    solver_parameters=None,
+    store=None,
+    verbose=True,
+):
+    """
+    :param store: RunStore the run's results are recorded to, if any
+    :param verbose: print the lineups and trades as the season progresses
+    """
+    parameters = {
+        "season": season_start,
+        "evaluation_strategy": evaluation_strategy,
+        "picking_strategy": picking_strategy,
+        "period_strategy": period_strategy,
+        "trades_count": trades_count,
+        "solver": solver,
+        "solver_parameters": solver_parameters or {},
+    }
     salary_cap = SEASONS_CAP_HIT[season_start]
 
     season = Season(start=season_start)
     source = BacktestingSource(season, PlayersSource)
 
-    past_pool, present_pool = source.load(
-        STRATEGIES[picking_strategy](), STRATEGIES[evaluation_strategy]()
-    )
+    with profiling.span("load"):
+        past_pool, present_pool = source.load(
+            STRATEGIES[picking_strategy](), STRATEGIES[evaluation_strategy]()
+        )
+
+    solver = SOLVERS[solver](**(solver_parameters or {}))
+    pick = solver.pick_pool(past_pool, salary_cap)
+
+    if verbose:
+        pruned = sum(stats["pruned"] for stats in solver.pruning_stats)
+        players = sum(stats["players"] for stats in solver.pruning_stats)
+        print(f"{season} pick ({pruned} of {players} players pruned as dominated):")
+        pick.print()
 
-    solver = CPSATSolver()
-    solution = solver.pick_pool(
-        [group.to_dict("records") for group in past_pool], salary_cap
+        print(f"\nTranslated to {season.next()}")
+        pick.translate(present_pool, source.present_index, source.key).print()
+
+        print("\nTrading...")
+    season_simulator = SeasonSimulator(
+        solver,
+        season,
+        present_pool,
+        salary_cap,
+        STRATEGIES[evaluation_strategy](),
+        STRATEGIES[period_strategy](),
+        trades_count=trades_count,
+        verbose=verbose,
     )
+    with profiling.span("season"):
+        solution = season_simulator.progress(pick)
+    if verbose:
+        solution.print()
 
+    if store is not None:
+        store.record(
+            "backtest", parameters, **simulation_record(season_simulator, pick)
+        )
+
+
+def monte_carlo(
+    season_start=2022,
+    evaluation_strategy="marqueur",
+    picking_strategy="marqueur",
+    solver="cpsat",
+    solver_parameters=None,
+    simulations=1000,
+    dispersion=None,
+    store=None,
+):
+    """
+    Picks a pool like backtest, then evaluates it over seasons simulated from the
+    picked season's stats instead of replaying the next season.
+    :param store: RunStore the pick and its mean value are recorded to, if any
+    :return: the pool's value in every simulated season
+    """
+    salary_cap = SEASONS_CAP_HIT[season_start]
+
+    season = Season(start=season_start)
+    with profiling.span("load"):
+        past_pool, _ = BacktestingSource(season, PlayersSource).load(
+            STRATEGIES[picking_strategy](), STRATEGIES[evaluation_strategy]()
+        )
+
+    solution = SOLVERS[solver](**(solver_parameters or {})).pick_pool(
+        past_pool, salary_cap
+    )
     print(f"{season} pick:")
     solution.print()
 
-    print(f"\nTranslated to {season.next()}")
-    solver.translate_to_data(present_pool).print()
+    with profiling.span("simulate"):
+        values = MonteCarloSeason(
+            past_pool, simulations=simulations, dispersion=dispersion
+        ).total_values(solution, STRATEGIES[evaluation_strategy]())
+
+    print(f"\nValue over {simulations} seasons simulated from {season}:")
+    print(
+        pd.Series(values)
+        .describe(percentiles=[0.05, 0.25, 0.5, 0.75, 0.95])
+        .to_string()
+    )
+
+    if store is not None:
+        store.record(
+            "monte_carlo",
+            {
+                "season": season_start,
+                "evaluation_strategy": evaluation_strategy,
+                "picking_strategy": picking_strategy,
+                "solver": solver,
+                "solver_parameters": solver_parameters or {},
+                "simulations": simulations,
+                "dispersion": dispersion,
+            },
+            total_value=values.mean(),
+            lineups={"pick": solution.lineup()},
+            timings={"pick_solve_time": solution.solve_time},
+        )
+    return values
+
+
+# data shared by the grid's worker processes, keyed by season start. It is sent once
+# to each worker when the pool starts instead of with every run.
+_grid_data = {}
+
+
+def _init_grid_worker(data):
+    _grid_data.update(data)
+
+
+def _grid_run(
+    season_start,
+    evaluation_strategy,
+    picking_strategy,
+    period_strategy,
+    trades_count,
+    solver,
+    solver_parameters,
+):
+    parameters = {
+        "season": season_start,
+        "evaluation_strategy": evaluation_strategy,
+        "picking_strategy": picking_strategy,
+        "period_strategy": period_strategy,
+        "trades_count": trades_count,
+        "solver": solver,
+        "solver_parameters": solver_parameters,
+    }
+    salary_cap = SEASONS_CAP_HIT[season_start]
+    past_players, present_players, past_values, present_values, stats_index = (
+        _grid_data[season_start]
+    )
+
+    past_pool, present_pool = BacktestingSource.apply_values(
+        past_players,
+        present_players,
+        [values[picking_strategy] for values in past_values],
+        [values[evaluation_strategy] for values in present_values],
+    )
+
+    solver = SOLVERS[solver](**solver_parameters)
+    solution = solver.pick_pool(past_pool, salary_cap)
 
-    print("\nTrading...")
     season_simulator = SeasonSimulator(
         solver,
-        season,
+        Season(start=season_start),
         present_pool,
         salary_cap,
         STRATEGIES[evaluation_strategy](),
         STRATEGIES[period_strategy](),
+        trades_count=trades_count,
+        stats_index=stats_index,
+        verbose=False,
+    )
+    season_simulator.progress(solution)
+
+    return {
+        "season": season_start,
+        "evaluation_strategy": evaluation_strategy,
+        "picking_strategy": picking_strategy,
+        "period_strategy": period_strategy,
+        "trades_count": trades_count,
+        "total_value": season_simulator.total_value(),
+        "period_values": list(season_simulator.period_values.values()),
+        "pick_time": solution.solve_time,
+        "pick_gap": solution.gap,
+        "trades_time": sum(season_simulator.trade_solve_times.values()),
+        # recorded by the parent process, in a single transaction
+        "record": {
+            "kind": "grid",
+            "parameters": parameters,
+            **simulation_record(season_simulator, solution),
+        },
+    }
+
+
+def grid(
+    seasons=None,
+    strategies=None,
+    trades_counts=None,
+    workers=None,
+    solver="cpsat",
+    solver_parameters=None,
+    store=None,
+):
+    """
+    Backtests every combination of evaluation, picking and period strategies, seasons
+    and trades counts across a pool of processes.
+    :param store: RunStore every run's results are recorded to, if any
+    :return: a dataframe with one row per combination
+    """
+    if seasons is None:
+        seasons = [2020, 2021, 2022]
+
+    if strategies is None:
+        strategies = list(STRATEGIES.keys())
+
+    if trades_counts is None:
+        trades_counts = [5]
+
+    solver_parameters = solver_parameters or {}
+    if solver == "cpsat":
+        # runs are already spread over processes, so CP-SAT shouldn't also use every
+        # core in each of them
+        solver_parameters = {"num_workers": 1, **solver_parameters}
+
+    # load every season once, and value its players under every strategy at once
+    instances = {strategy: STRATEGIES[strategy]() for strategy in strategies}
+    data = {}
+    for season_start in seasons:
+        season = Season(start=season_start)
+        past_players, present_players = BacktestingSource(
+            season, PlayersSource
+        ).load_players()
+        past_values, present_values = (
+            [
+                evaluate_strategies(players, player_type, instances)
+                for player_type, players in zip(PLAYER_TYPES, pool)
+            ]
+            for pool in (past_players, present_players)
+        )
+        stats_index = DailyStatsIndex(HockeyReferenceGamesSource(season).load())
+        data[season_start] = (
+            past_players,
+            present_players,
+            past_values,
+            present_values,
+            stats_index,
+        )
+
+    runs = list(
+        itertools.product(
+            seasons,
+            strategies,
+            strategies,
+            strategies,
+            trades_counts,
+            [solver],
+            [solver_parameters],
+        )
+    )
+
+    with ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count(),
+        initializer=_init_grid_worker,
+        initargs=(data,),
+    ) as executor:
+        results = list(executor.map(_grid_run, *zip(*runs)))
+
+    records = [result.pop("record") for result in results]
+    if store is not None:
+        store.record_many(records)
+
+    # periods are keyed by their month, so that every season's periods line up
+    period_values = pd.DataFrame(
+        [result.pop("period_values") for result in results]
+    ).reindex(columns=range(len(PERIOD_MONTHS)))
+    period_values.columns = [calendar.month_abbr[month] for month in PERIOD_MONTHS]
+
+    df = pd.DataFrame(results)
+    position = df.columns.get_loc("total_value") + 1
+    df = pd.concat(
+        [df.iloc[:, :position], period_values, df.iloc[:, position:]], axis=1
+    )
+
+    # values are only comparable under the same evaluation strategy
+    return df.sort_values(
+        ["season", "evaluation_strategy", "total_value"],
+        ascending=[True, True, False],
+        ignore_index=True,
     )
-    solution = season_simulator.progress(solution)
-    solution.print()
 
 
 def parse_args():
     parser = argparse.ArgumentParser(
         description="Backtest pool picking strategies from past to present seasons."
     )
+    parser.add_argument(
+        "mode",
+        nargs="?",
+        default="single",
+        choices=["single", "grid", "monte_carlo"],
+        help="Backtest a single combination of strategies, a grid of seasons, "
+        "strategies and trades counts, or a pick over simulated seasons.",
+    )
     parser.add_argument(
         "--season",
         type=int,
@@ -60,31 +358,144 @@ def parse_args():
         type=str,
         default="marqueur",
         choices=STRATEGIES.keys(),
-        help="Evaluation strategy. This is the strategy used to evaluate the pool of players.",
+        help="Evaluation strategy. This is the strategy used to evaluate the pool of "
+        "players.",
     )
     parser.add_argument(
         "--picking_strategy",
         type=str,
         default="marqueur",
         choices=STRATEGIES.keys(),
-        help="Picking strategy. This is the strategy used to pick the initial pool of players.",
+        help="Picking strategy. This is the strategy used to pick the initial pool of "
+        "players.",
     )
     parser.add_argument(
         "--period_strategy",
         type=str,
         default="marqueur",
         choices=STRATEGIES.keys(),
-        help="Period strategy. This is the strategy used to pick players for each monthly period.",
+        help="Period strategy. This is the strategy used to pick players for each "
+        "monthly period.",
+    )
+    parser.add_argument(
+        "--trades_count",
+        type=int,
+        default=5,
+        help="Maximum number of trades per monthly period.",
+    )
+    parser.add_argument(
+        "--solver",
+        type=str,
+        default="cpsat",
+        choices=SOLVERS.keys(),
+        help="Solver used to pick the pool and trades.",
+    )
+    add_solver_parameters_arguments(parser)
+    parser.add_argument(
+        "--seasons",
+        nargs="+",
+        type=int,
+        default=[2020, 2021, 2022],
+        choices=[2020, 2021, 2022],
+        help="Grid mode. Start years of the seasons to backtest against.",
+    )
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        default=list(STRATEGIES.keys()),
+        choices=STRATEGIES.keys(),
+        help="Grid mode. Strategies to combine as evaluation, picking and period "
+        "strategies.",
+    )
+    parser.add_argument(
+        "--trades_counts",
+        nargs="+",
+        type=int,
+        default=[5],
+        help="Grid mode. Maximum numbers of trades per monthly period.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Grid mode. Number of worker processes. Defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Grid mode. CSV file to write the results table to.",
+    )
+
+    parser.add_argument(
+        "--simulations",
+        type=int,
+        default=1000,
+        help="Monte Carlo mode. Number of simulated seasons.",
+    )
+    parser.add_argument(
+        "--dispersion",
+        type=float,
+        default=None,
+        help="Monte Carlo mode. Lower values make players' scoring vary more from "
+        "season to season. Scoring only varies from game to game by default.",
+    )
+    add_profile_argument(parser)
+    add_store_arguments(parser)
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Don't print lineups and trades, e.g. when reading results from the "
+        "store.",
     )
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    check_solver_parameters(parser, args)
+    if args.mode == "grid" and args.profile is not None:
+        parser.error(
+            "--profile isn't supported in grid mode, whose runs are spread over "
+            "processes"
+        )
+    return args
 
 
 if __name__ == "__main__":
     args = parse_args()
-    backtest(
-        season_start=args.season,
-        evaluation_strategy=args.evaluation_strategy,
-        picking_strategy=args.picking_strategy,
-        period_strategy=args.period_strategy
-    )
+    if args.mode == "grid":
+        results = grid(
+            seasons=args.seasons,
+            strategies=args.strategies,
+            trades_counts=args.trades_counts,
+            workers=args.workers,
+            solver=args.solver,
+            solver_parameters=solver_parameters(args),
+            store=run_store(args),
+        )
+        print(results.to_string(index=False))
+        if args.output is not None:
+            results.to_csv(args.output, index=False)
+    elif args.mode == "monte_carlo":
+        with profiled(args.profile):
+            monte_carlo(
+                season_start=args.season,
+                evaluation_strategy=args.evaluation_strategy,
+                picking_strategy=args.picking_strategy,
+                solver=args.solver,
+                solver_parameters=solver_parameters(args),
+                simulations=args.simulations,
+                dispersion=args.dispersion,
+                store=run_store(args),
+            )
+    else:
+        with profiled(args.profile):
+            backtest(
+                season_start=args.season,
+                evaluation_strategy=args.evaluation_strategy,
+                picking_strategy=args.picking_strategy,
+                period_strategy=args.period_strategy,
+                trades_count=args.trades_count,
+                solver=args.solver,
+                solver_parameters=solver_parameters(args),
+                store=run_store(args),
+                verbose=not args.quiet,
+            )
@@ -0,0 +1,120 @@
+import pandas as pd
+
+GAME_STATS_COLUMNS = [
+    "goals",
+    "assists",
+    "wins",
+    "shutouts",
+    "games_played",
+    "saves_percent",
+]
+
+
+class GameEvents:
+    """
+    Flat event tables exploded once from the nested `scores` and `goalies` columns of
+    the games dataframe. Stats over any date window are then computed with groupbys
+    instead of walking every game.
+
+    Players are identified by their hockey-reference player code when every game has
+    them, and by their display name for games crawled before codes were captured.
+    Those games don't tell players sharing a name apart, e.g. the two Matt Murrays,
+    who then get the stats of both.
+    """
+
+    def __init__(self, games: pd.DataFrame):
+        scores = games[["date", "scores"]].explode("scores", ignore_index=True)
+        scores = scores.dropna(subset=["scores"]).reset_index(drop=True)
+        score_details = pd.DataFrame(
+            scores["scores"].tolist(),
+            columns=["scorer", "assists", "scorer_code", "assist_codes"],
+        )
+
+        self.goals = pd.DataFrame(
+            {
+                "date": scores["date"],
+                "name": score_details["scorer"],
+                "player_code": score_details["scorer_code"],
+            }
+        )
+
+        assist_codes = [
+            codes if isinstance(codes, list) else [None] * len(names)
+            for names, codes in zip(
+                score_details["assists"], score_details["assist_codes"]
+            )
+        ]
+        assists = pd.DataFrame(
+            {
+                "date": scores["date"],
+                "name": score_details["assists"],
+                "player_code": assist_codes,
+            }
+        ).explode(["name", "player_code"], ignore_index=True)
+        self.assists = assists.dropna(subset=["name"]).reset_index(drop=True)
+
+        goalies = games[["date", "goalies"]].explode("goalies", ignore_index=True)
+        goalies = goalies.dropna(subset=["goalies"]).reset_index(drop=True)
+        goalie_details = pd.DataFrame(
+            goalies["goalies"].tolist(),
+            columns=[
+                "name",
+                "player_code",
+                "decision",
+                "shutout",
+                "saves",
+                "saves_percent",
+            ],
+        )
+        # TODO(nico): It isn't clear if we should double-count shutouts and wins.
+        #  Right now, we do.
+        wins = goalie_details["decision"] == "W"
+        self.goalies = pd.DataFrame(
+            {
+                "date": goalies["date"],
+                "name": goalie_details["name"],
+                "player_code": goalie_details["player_code"],
+                "wins": wins.astype(int),
+                "shutouts": (wins & goalie_details["shutout"].eq(True)).astype(int),
+                "saves": goalie_details["saves"].fillna(0).astype(int),
+                "saves_percent": goalie_details["saves_percent"].astype(float),
+            }
+        )
+
+        # column identifying players in the event tables
+        codes = pd.concat(
+            [
+                self.goals["player_code"],
+                self.assists["player_code"],
+                self.goalies["player_code"],
+            ]
+        )
+        self.key = "player_code" if codes.notna().all() else "name"
+
+    def stats(self, start, end) -> pd.DataFrame:
+        """
+        Per-player stats for games played between start and end, inclusively, indexed
+        by the player's key.
+        """
+        goals = self._between(self.goals, start, end).groupby(self.key).size()
+        assists = self._between(self.assists, start, end).groupby(self.key).size()
+        goalies = (
+            self._between(self.goalies, start, end)
+            .groupby(self.key)
+            .agg(
+                wins=("wins", "sum"),
+                shutouts=("shutouts", "sum"),
+                games_played=("date", "size"),
+                saves_percent=("saves_percent", "mean"),
+            )
+        )
+
+        stats = pd.concat(
+            [goals.rename("goals"), assists.rename("assists"), goalies], axis=1
+        )
+        stats = stats.reindex(columns=GAME_STATS_COLUMNS).fillna(0)
+        return stats.astype({column: int for column in GAME_STATS_COLUMNS[:-1]})
+
+    @staticmethod
+    def _between(events, start, end):
+        return events[(start <= events["date"]) & (events["date"] <= end)]
@@ -0,0 +1,155 @@
+import math
+
+import numpy as np
+
+
+def solve(values, weights, counts, capacity, incumbents=None, max_new=None):
+    """
+    Exact solver for picking exactly counts[j] players out of every group j, under a
+    shared capacity, maximizing the total value. Values must be non-negative integers.
+
+    Every group is solved with a dynamic program over (picks, new picks, total value)
+    holding the minimum weight reaching each state, which is small since the values
+    are points. Groups are then combined with min-plus convolutions.
+
+    :param incumbents: per group, indices of the players currently picked
+    :param max_new: maximum number of picked players that aren't incumbents
+    :return: per group, the sorted indices of the picked players, or None when no team
+    fits under the capacity
+    """
+    values = [np.asarray(group_values) for group_values in values]
+    weights = [np.asarray(group_weights, dtype=float) for group_weights in weights]
+    values = _to_integers(values)
+
+    if incumbents is None or max_new is None:
+        max_new = 0
+        is_new = [np.zeros(len(group_values), dtype=bool) for group_values in values]
+    else:
+        max_new = min(max_new, sum(counts))
+        is_new = []
+        for group_values, group_incumbents in zip(values, incumbents):
+            group_is_new = np.ones(len(group_values), dtype=bool)
+            group_is_new[list(group_incumbents)] = False
+            is_new.append(group_is_new)
+
+    groups = [
+        _solve_group(group_values, group_weights, count, group_is_new, max_new)
+        for group_values, group_weights, count, group_is_new in zip(
+            values, weights, counts, is_new
+        )
+    ]
+
+    # combine groups one at a time, keeping intermediate results for backtracking
+    combined = [groups[0][0]]
+    for best, _ in groups[1:]:
+        combined.append(_min_plus(combined[-1], best, max_new))
+
+    feasible = np.argwhere(combined[-1] <= capacity)
+    if len(feasible) == 0:
+        return None
+    new, value = feasible[np.argmax(feasible[:, 1])]
+    weight = combined[-1][new, value]
+
+    # walk back through the combinations to find each group's share
+    targets = [None] * len(groups)
+    for j in range(len(groups) - 1, 0, -1):
+        best = groups[j][0]
+        for group_new, group_value in np.argwhere(np.isfinite(best)):
+            rest_new, rest_value = new - group_new, value - group_value
+            if not (
+                0 <= rest_new < combined[j - 1].shape[0]
+                and 0 <= rest_value < combined[j - 1].shape[1]
+            ):
+                continue
+            rest_weight = combined[j - 1][rest_new, rest_value]
+            if rest_weight + best[group_new, group_value] == weight:
+                targets[j] = (group_new, group_value)
+                new, value, weight = rest_new, rest_value, rest_weight
+                break
+    targets[0] = (new, value)
+
+    return [
+        _backtrack(take, group_values, count, group_is_new, *target)
+        for (_, take), group_values, count, group_is_new, target in zip(
+            groups, values, counts, is_new, targets
+        )
+    ]
+
+
+def _to_integers(values):
+    all_values = np.concatenate(values)
+    if not np.allclose(all_values, np.round(all_values)):
+        raise ValueError("The knapsack solver requires integral player values.")
+    if (all_values < 0).any():
+        raise ValueError("The knapsack solver requires non-negative player values.")
+
+    values = [np.round(group_values).astype(np.int64) for group_values in values]
+
+    # scaling down values shrinks the tables, e.g. when every value is a multiple of 4
+    divisor = math.gcd(*np.concatenate(values).tolist()) or 1
+    return [group_values // divisor for group_values in values]
+
+
+def _solve_group(values, weights, count, is_new, max_new):
+    """
+    :return: best[new, value], the minimum weight of picking count players with new
+    non-incumbents reaching exactly that value, and for every player, the states it
+    improved.
+    """
+    max_value = int(np.sort(values)[::-1][:count].sum())
+    new_count = min(max_new, count) + 1
+
+    dp = np.full((count + 1, new_count, max_value + 1), np.inf)
+    dp[0, 0, 0] = 0
+    take = np.zeros((len(values), count, new_count, max_value + 1), dtype=bool)
+
+    for i, (value, weight, new) in enumerate(zip(values, weights, is_new)):
+        if new and new_count == 1:
+            continue
+
+        reachable = max_value + 1 - value
+        # from (picks - 1, new - is_new, value - player value) to (picks, new, value)
+        if new:
+            candidate = dp[:-1, :-1, :reachable] + weight
+            current = dp[1:, 1:, value:]
+            improved = take[i, :, 1:, value:]
+        else:
+            candidate = dp[:-1, :, :reachable] + weight
+            current = dp[1:, :, value:]
+            improved = take[i, :, :, value:]
+
+        improved[...] = candidate < current
+        current[improved] = candidate[improved]
+
+    return dp[count], take
+
+
+def _min_plus(a, b, max_new):
+    """
+    result[n, v] = min(a[n1, v1] + b[n2, v2]) over n1 + n2 = n and v1 + v2 = v
+    """
+    new_count = min(a.shape[0] + b.shape[0] - 1, max_new + 1)
+    result = np.full((new_count, a.shape[1] + b.shape[1] - 1), np.inf)
+
+    for new, value in np.argwhere(np.isfinite(b)):
+        rows = min(a.shape[0], new_count - new)
+        if rows <= 0:
+            continue
+        window = result[new : new + rows, value : value + a.shape[1]]
+        np.minimum(window, a[:rows] + b[new, value], out=window)
+
+    return result
+
+
+def _backtrack(take, values, count, is_new, new, value):
+    picks = []
+    for i in range(len(values) - 1, -1, -1):
+        if count == 0:
+            break
+        if take[i, count - 1, new, value]:
+            picks.append(i)
+            count -= 1
+            value -= values[i]
+            new -= int(is_new[i])
+
+    return sorted(picks)
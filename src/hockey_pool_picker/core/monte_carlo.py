@@ -0,0 +1,146 @@
+import numpy as np
+
+from hockey_pool_picker.util import PLAYER_TYPES
+
+SEASON_GAMES = 82
+# team games in each monthly period, from October to April
+PERIOD_GAMES = [9, 13, 14, 13, 12, 15, 6]
+
+
+class SimulatedStats(dict):
+    """
+    Stats of simulated players, keyed by column, as arrays shaped (simulations,
+    players, periods). Strategies evaluate them like dataframes, on every draw at once.
+    """
+
+    @property
+    def columns(self):
+        return list(self.keys())
+
+
+class MonteCarloSeason:
+    """
+    Samples many synthetic seasons from players' rates over a past season, to see the
+    distribution of a team's value instead of the single value of a replayed season.
+
+    Every player plays each of the team's games with the share of games they played.
+    Goals and assists per game played follow Poisson distributions, or negative
+    binomial ones when a dispersion is given, so that a player's whole season can be
+    better or worse than their rate. Goalies win the games they play at their win
+    rate, and a win is a shutout at their shutout rate.
+
+    Players are only simulated once a team they're part of is evaluated, each from
+    their own random stream, so every team sees the same seasons for the same player.
+    """
+
+    def __init__(
+        self,
+        pool,
+        simulations=1000,
+        period_games=None,
+        dispersion=None,
+        seed=None,
+    ):
+        """
+        :param pool: per group, a dataframe of the players' stats over a past season,
+        e.g. a pool from BacktestingSource
+        :param dispersion: shape of the gamma distribution scaling every player's
+        scoring rates for a season. Lower is more variable, and None disables it.
+        """
+        if period_games is None:
+            period_games = PERIOD_GAMES
+
+        self.simulations = simulations
+        self.period_games = np.asarray(period_games)
+        self.dispersion = dispersion
+        self.seed = np.random.SeedSequence(seed).entropy
+
+        self.rates = [_fit(players) for players in pool]
+        # (group, player) -> the player's simulated stats, shaped (simulations, periods)
+        self._simulated = {}
+
+    def stats(self, group, indices) -> SimulatedStats:
+        """
+        :return: the simulated stats of the group's players at indices
+        """
+        players = [self._simulate(group, int(i)) for i in indices]
+        columns = players[0].keys() if players else []
+        return SimulatedStats(
+            {
+                column: np.stack([player[column] for player in players], axis=1)
+                for column in columns
+            }
+        )
+
+    def _simulate(self, group, i):
+        if (group, i) in self._simulated:
+            return self._simulated[(group, i)]
+
+        rates = {name: rate[i] for name, rate in self.rates[group].items()}
+        rng = np.random.default_rng([self.seed, group, i])
+        shape = (self.simulations, len(self.period_games))
+
+        games = rng.binomial(self.period_games, rates["availability"], size=shape)
+
+        form = 1.0
+        if self.dispersion is not None:
+            form = rng.gamma(
+                self.dispersion, 1 / self.dispersion, (self.simulations, 1)
+            )
+
+        stats = {"games_played": games}
+        for name in ["goals", "assists"]:
+            stats[name] = rng.poisson(rates[name] * form * games)
+
+        if PLAYER_TYPES[group] == "goalie":
+            stats["wins"] = rng.binomial(games, rates["wins"])
+            stats["shutouts"] = rng.binomial(stats["wins"], rates["shutouts"])
+            # periods without games have no saves percent, like replayed periods
+            stats["saves_percent"] = np.where(games > 0, rates["saves_percent"], 0)
+
+        self._simulated[(group, i)] = stats
+        return stats
+
+    def values(self, solution, strategy):
+        """
+        :return: the value of the solution's team in every simulated period, shaped
+        (simulations, periods)
+        """
+        values = np.zeros((self.simulations, len(self.period_games)))
+        for group, (indices, player_type) in enumerate(
+            zip(solution.pick_indices, PLAYER_TYPES)
+        ):
+            picked = self.stats(group, indices)
+            values += np.asarray(strategy.apply(picked, player_type)).sum(axis=1)
+
+        return values
+
+    def total_values(self, solution, strategy):
+        """
+        :return: the value of the solution's team over every simulated season
+        """
+        return self.values(solution, strategy).sum(axis=1)
+
+
+def _fit(players):
+    """
+    :return: the rates of every player, per game played when not stated otherwise
+    """
+
+    def column(name):
+        if name not in players.columns:
+            return np.zeros(len(players))
+        return players[name].to_numpy(dtype=float)
+
+    games_played = column("games_played")
+    played = np.maximum(games_played, 1)
+    return {
+        # share of the team's games played
+        "availability": np.minimum(games_played / SEASON_GAMES, 1),
+        "goals": column("goals") / played,
+        "assists": column("assists") / played,
+        "wins": np.minimum(column("wins") / played, 1),
+        # per win
+        "shutouts": np.minimum(column("shutouts") / np.maximum(column("wins"), 1), 1),
+        "saves_percent": column("saves_percent"),
+    }
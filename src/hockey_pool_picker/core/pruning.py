@@ -0,0 +1,36 @@
+import numpy as np
+
+
+def prune_dominated(values, weights, picks_count, keep=None):
+    """
+    Finds the players of a group that can't be in an optimal team. A player is
+    dominated by another one that has at least the same value for at most the same
+    weight. When a player is dominated by at least as many players as there are picks
+    in the group, one of them is always left to replace it.
+
+    Ties are broken by position so that identical players don't dominate each other.
+
+    :param keep: indices of players to never prune, e.g. currently picked players that
+    can be kept through trades
+    :return: a mask of the players that are kept as candidates
+    """
+    values = np.asarray(values, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+
+    # dominates[j, i] is True if player j dominates player i
+    at_least_as_good = (values[:, None] >= values[None, :]) & (
+        weights[:, None] <= weights[None, :]
+    )
+    strictly_better = (values[:, None] > values[None, :]) | (
+        weights[:, None] < weights[None, :]
+    )
+    positions = np.arange(len(values))
+    dominates = at_least_as_good & (
+        strictly_better | (positions[:, None] < positions[None, :])
+    )
+
+    candidates = dominates.sum(axis=0) < picks_count
+    if keep is not None:
+        candidates[list(keep)] = True
+
+    return candidates
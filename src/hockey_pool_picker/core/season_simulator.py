@@ -1,31 +1,30 @@
 import calendar
-from collections import defaultdict
+import warnings
 from datetime import datetime
-from statistics import mean
 
+import pandas as pd
 from dateutil.relativedelta import relativedelta
 
+from hockey_pool_picker import profiling
 from hockey_pool_picker.core.season import Season
 from hockey_pool_picker.core.solver import Solution
+from hockey_pool_picker.core.stats_index import DailyStatsIndex
 from hockey_pool_picker.util import PLAYER_TYPES
 from hockey_pool_picker.sources.games.hockey_reference import HockeyReferenceGamesSource
 
+# months of the monthly periods of a season, from its start
+PERIOD_MONTHS = [10, 11, 12, 1, 2, 3, 4]
+
 
 def evaluate_period(players_over_period, solution, evaluation_strategy):
-    picks = []
     for i, player_type in enumerate(PLAYER_TYPES):
         group = players_over_period[i]
         group["value"] = evaluation_strategy.apply(group, player_type)
-        names = [player["name"] for player in solution.picks()[i]]
-        picked_players = group[group["name"].isin(names)]
-
-        picks.append(picked_players)
 
     # We should list % increase/decrease of choices
     # Maybe when passing our players to the trading algo, we should only pass players
     # for the last month, instead of for the whole season
-    summary = Solution([group.to_dict("records") for group in picks]).summary()
-    return summary.iloc[-1]["value"]
+    return Solution(players_over_period, solution.pick_indices).value()
 
 
 def get_month_period(season: Season, month, days=0):
@@ -46,6 +45,9 @@ class SeasonSimulator:
         salary_cap,
         evaluation_strategy,
         picking_strategy,
+        trades_count=5,
+        stats_index=None,
+        verbose=True,
     ):
         self.solver = solver
         self.season = season
@@ -53,19 +55,32 @@ class SeasonSimulator:
         self.salary_cap = salary_cap
         self.evaluation_strategy = evaluation_strategy
         self.picking_strategy = picking_strategy
+        self.trades_count = trades_count
+        # the index can be built ahead of time to share it between simulations
+        self.stats_index = stats_index
+        self.verbose = verbose
+
+        # filled as the season progresses, keyed by period
+        self.period_values = {}
+        self.trade_solve_times = {}
+        # the team that earned the period's value, valued over the period
+        self.lineups = {}
+        # players removed and added by the trades picked after the period
+        self.trades = {}
 
     def progress(self, solution):
         # TODO(nico): Revisit this logic
         # regular season is from October 7, 2022, and ended April 14, 2023.
-        games = HockeyReferenceGamesSource(self.season).load()
+        if self.stats_index is None:
+            with profiling.span("stats_index"):
+                self.stats_index = DailyStatsIndex(
+                    HockeyReferenceGamesSource(self.season).load()
+                )
+        if self.stats_index.key == "name":
+            self._warn_shared_names()
         periods = [
-            (self.season, 10),
-            (self.season, 11),
-            (self.season, 12),
-            (self.season.next(), 1),
-            (self.season.next(), 2),
-            (self.season.next(), 3),
-            (self.season.next(), 4),
+            (self.season if month >= PERIOD_MONTHS[0] else self.season.next(), month)
+            for month in PERIOD_MONTHS
         ]
         total_value = 0
         for period_season, period_month in periods:
@@ -77,112 +92,101 @@ class SeasonSimulator:
             # - we could pick only players that have increased in the past 2-3 periods,
             # instead of checking only last period
             # - we could remove players that get hurt as they get hurt
-            look_games_for_period = games[
-                (start_look <= games["date"]) & (games["date"] <= end_look)
-            ]
-            pts_games_for_period = games[
-                (start_pts <= games["date"]) & (games["date"] <= end_pts)
-            ]
-
-            pts_players_over_period = []
-            look_players_over_period = []
-            for i, player_type in enumerate(PLAYER_TYPES):
-                pts_players_over_period.append(
-                    self.player_stats_for_games(
-                        self.present_pool[i].copy(),
-                        pts_games_for_period.copy(),
-                        player_type,
-                        self.picking_strategy,
+            with profiling.span("period_stats"):
+                look_stats_for_period = self.stats_index.stats(start_look, end_look)
+                pts_stats_for_period = self.stats_index.stats(start_pts, end_pts)
+
+                pts_players_over_period = []
+                look_players_over_period = []
+                for i, player_type in enumerate(PLAYER_TYPES):
+                    pts_players_over_period.append(
+                        self.player_stats_for_games(
+                            self.present_pool[i].copy(),
+                            pts_stats_for_period,
+                            player_type,
+                            self.picking_strategy,
+                        )
                     )
-                )
-                look_players_over_period.append(
-                    self.player_stats_for_games(
-                        self.present_pool[i].copy(),
-                        look_games_for_period.copy(),
-                        player_type,
-                        self.picking_strategy,
+                    look_players_over_period.append(
+                        self.player_stats_for_games(
+                            self.present_pool[i].copy(),
+                            look_stats_for_period,
+                            player_type,
+                            self.picking_strategy,
+                        )
                     )
-                )
 
-            value = evaluate_period(
-                pts_players_over_period, solution, self.evaluation_strategy
-            )
+            with profiling.span("evaluate_period"):
+                value = evaluate_period(
+                    pts_players_over_period, solution, self.evaluation_strategy
+                )
+            profiling.count("periods")
             total_value += value
+            period = start_pts.strftime("%b %Y")
+            self.period_values[period] = value
+            self.lineups[period] = Solution(
+                pts_players_over_period, solution.pick_indices
+            )
 
             if (period_season, period_month) == periods[-1]:
-                print(
-                    f'Looking from {start_look.strftime("%b %d, %Y")} to '
-                    f'{end_look.strftime("%b %d, %Y")}'
-                )
-                print(f'{start_pts.strftime("%B %Y")}: {value}')
-                print("\n")
+                if self.verbose:
+                    print(
+                        f'Looking from {start_look.strftime("%b %d, %Y")} to '
+                        f'{end_look.strftime("%b %d, %Y")}'
+                    )
+                    print(f'{start_pts.strftime("%B %Y")}: {value}')
+                    print("\n")
                 # last period, we don't pick trades
                 break
 
             new_solution = self.solver.pick_trades(
                 solution,
-                [group.to_dict("records") for group in look_players_over_period],
+                look_players_over_period,
                 self.salary_cap,
-                5,
+                self.trades_count,
             )
+            self.trade_solve_times[period] = new_solution.solve_time
+            self.trades[period] = solution.differences(new_solution)
 
-            print(
-                f'Looking from {start_look.strftime("%B %Y %d")} to '
-                f'{end_look.strftime("%B %Y %d")}'
-            )
-            print(f'{start_pts.strftime("%B %Y")}: {value}')
-            solution.print_differences(new_solution)
-            print()
+            if self.verbose:
+                print(
+                    f'Looking from {start_look.strftime("%B %Y %d")} to '
+                    f'{end_look.strftime("%B %Y %d")}'
+                )
+                print(f'{start_pts.strftime("%B %Y")}: {value}')
+                solution.print_differences(new_solution)
+                print()
 
             solution = new_solution
 
-        print(f"Total value: {total_value} ({2626 - total_value} to go)")
+        if self.verbose:
+            print(f"Total value: {total_value} ({2626 - total_value} to go)")
         return solution
 
-    def player_stats_for_games(self, players, games, player_type, strategy):
-        goals = defaultdict(int)
-        assists = defaultdict(int)
-        saves = defaultdict(int)
-        saves_percent = defaultdict(list)
-        wins = defaultdict(int)
-        shutouts = defaultdict(int)
-        games_played = defaultdict(int)
-
-        for _, game in games.iterrows():
-            for score in game.scores:
-                for assist in score["assists"]:
-                    assists[assist] += 1
-
-                goals[score["scorer"]] += 1
-
-            for goalie in game.goalies:
-                games_played[goalie["name"]] += 1
-                saves[goalie["name"]] += goalie["saves"]
-
-                if goalie["saves_percent"] is not None:
-                    saves_percent[goalie["name"]].append(goalie["saves_percent"])
-
-                if "decision" in goalie and goalie["decision"] == "W":
-                    # TODO(nico): It isn't clear if we should double-count shutouts and
-                    #  wins. Right now, we do.
-                    wins[goalie["name"]] += 1
-                    if goalie["shutout"]:
-                        shutouts[goalie["name"]] += 1
-
-        for i, player in players.iterrows():
-            players.at[i, "goals"] = goals[player["name"]]
-            players.at[i, "assists"] = assists[player["name"]]
-
-            if player_type == "goalie":
-                players.at[i, "assists"] = assists[player["name"]]
-                players.at[i, "wins"] = wins[player["name"]]
-                players.at[i, "shutouts"] = shutouts[player["name"]]
-                players.at[i, "games_played"] = games_played[player["name"]]
-                players.at[i, "saves_percent"] = (
-                    mean(saves_percent[player["name"]])
-                    if player["name"] in saves_percent
-                    else 0
-                )
+    def _warn_shared_names(self):
+        names = pd.concat([players["name"] for players in self.present_pool])
+        shared = sorted(names[names.duplicated()].unique())
+        if shared:
+            warnings.warn(
+                f"Games of season {self.season} are keyed by name, so players "
+                f"sharing a name get the stats of all of them: {', '.join(shared)}",
+                stacklevel=3,
+            )
+
+    def total_value(self):
+        return sum(self.period_values.values())
+
+    def player_stats_for_games(self, players, stats, player_type, strategy):
+        columns = ["goals", "assists"]
+        if player_type == "goalie":
+            columns += ["wins", "shutouts", "games_played", "saves_percent"]
+
+        # players who didn't appear in any game over the period get zeroes
+        period_stats = stats.reindex(players[self.stats_index.key], fill_value=0)[
+            columns
+        ]
+        for column in columns:
+            players[column] = period_stats[column].to_numpy()
 
         players["value"] = strategy.apply(players, player_type)
 
@@ -1,43 +1,68 @@
+import heapq
+import itertools
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
 import pandas as pd
-from ortools.sat.python import cp_model
+
+from hockey_pool_picker import profiling
+from hockey_pool_picker.core import knapsack
+from hockey_pool_picker.core.pruning import prune_dominated
+
+
+GROUP_NAMES = ["forwards", "defenders", "goalies"]
+
+# OR-Tools is slow to import, so it's only imported once a CP-SAT solver is created
+cp_model = None
 
 
 class Solution:
-    def __init__(self, picks, pick_indices=[]):
-        self.forwards_group = Solution._build_group(picks[0], "forwards")
-        self.defenders_group = Solution._build_group(picks[1], "defenders")
-        self.goalies_group = Solution._build_group(picks[2], "goalies")
+    def __init__(self, pool, pick_indices, solve_time=0.0, gap=0.0):
+        """
+        :param pool: per group, the dataframe of players the picks were made from
+        :param pick_indices: per group, the positions of the picked players in the pool
+        """
+        self.pool = pool
+        self.pick_indices = [
+            np.asarray(indices, dtype=np.int64) for indices in pick_indices
+        ]
+        # wall time in seconds the solver took to find this solution
+        self.solve_time = solve_time
+        # relative gap between the solution's value and the best possible value, which
+        # is 0 when the solution is proven optimal
+        self.gap = gap
+
+        # per group totals
+        self.weights = self._sum_column("weight")
+        self.values = self._sum_column("value")
+
+    def _sum_column(self, column):
+        return np.array(
+            [
+                group[column].to_numpy()[indices].sum()
+                for group, indices in zip(self.pool, self.pick_indices)
+            ]
+        )
+
+    def weight(self):
+        return self.weights.sum()
 
-        self.pick_indices = pick_indices
+    def value(self):
+        return self.values.sum()
 
     def picks(self):
         return [
-            group["players"]
-            for group in [self.forwards_group, self.defenders_group, self.goalies_group]
+            group.iloc[indices] for group, indices in zip(self.pool, self.pick_indices)
         ]
 
-    @staticmethod
-    def _build_group(players, name):
-        return {
-            "name": name,
-            "players": players,
-            "weight": sum(player["weight"] for player in players),
-            "value": sum(player["value"] for player in players),
-        }
-
     def print(self):
-        df = pd.DataFrame(
-            self.forwards_group["players"]
-            + self.defenders_group["players"]
-            + self.goalies_group["players"]
-        )
-        print(
-            df[df.columns[~df.columns.isin(["normalized_name"])]][
-                ["name", "position", "cap_hit"]
-            ].to_string()
-        )
+        df = pd.concat(self.picks())
+        print(df[["name", "position", "cap_hit"]].to_string())
 
         print(self._build_summary().to_string(index=False))
+        if self.gap > 0:
+            print(f"Within {self.gap:.2%} of optimal")
 
     def summary(self):
         summary_df = self._build_summary()
@@ -47,45 +72,81 @@ class Solution:
         print(self.summary().to_string(index=False))
 
     def _build_summary(self):
-        groups = [self.forwards_group, self.defenders_group, self.goalies_group]
-
-        summary_df = pd.DataFrame(
-            [[group["name"], group["weight"], group["value"]] for group in groups],
-            columns=["name", "weight", "value"],
+        return pd.DataFrame(
+            {
+                "name": GROUP_NAMES + ["total"],
+                "weight": [*self.weights, self.weight()],
+                "value": [*self.values, self.value()],
+            }
         )
-        summary_df.loc[len(summary_df)] = [
-            "total",
-            summary_df["weight"].sum(),
-            summary_df["value"].sum(),
-        ]
 
-        return summary_df
-
-    def print_differences(self, after):
+    def translate(self, pool, index, key):
+        """
+        Finds the picked players in another pool, e.g. the next season's.
+        :param index: per group, the positions of the pool's players indexed by key
+        :param key: column identifying a player in both pools
+        :return: the solution made of the picked players found in the pool
+        """
+        pick_indices = []
+        with profiling.span("translate"):
+            for group, indices, group_index in zip(self.pool, self.pick_indices, index):
+                keys = group[key].to_numpy()[indices]
+                positions = group_index.reindex(keys).to_numpy()
+
+                missing = np.isnan(positions)
+                for name in group["name"].to_numpy()[indices[missing]]:
+                    print(f"\033[31m{name} has no counterpart, skipping\033[39m")
+
+                pick_indices.append(positions[~missing].astype(np.int64))
+
+        return Solution(pool, pick_indices)
+
+    def lineup(self) -> pd.DataFrame:
+        """
+        :return: the picked players, with the group they're picked in
+        """
+        columns = ["name", "player_id", "value", "weight"]
+        return pd.concat(
+            [
+                picks.reindex(columns=columns).assign(group=group_name)
+                for group_name, picks in zip(GROUP_NAMES, self.picks())
+            ],
+            ignore_index=True,
+        )[["group", *columns]]
+
+    def differences(self, after) -> (pd.DataFrame, pd.DataFrame):
+        """
+        :return: the players removed from and added to the solution in after, with
+        the group they're picked in
+        """
+        # both solutions are picked from the same players, so they're compared by
+        # position
         removed = []
         added = []
-        for before_group, after_group in zip(self.picks(), after.picks()):
-            after_names = set([player["name"] for player in after_group])
-            before_names = set([player["name"] for player in before_group])
+        for group_name, before_group, after_group, before_indices, after_indices in zip(
+            GROUP_NAMES, self.pool, after.pool, self.pick_indices, after.pick_indices
+        ):
+            removed.append(
+                before_group.iloc[np.setdiff1d(before_indices, after_indices)].assign(
+                    group=group_name
+                )
+            )
+            added.append(
+                after_group.iloc[np.setdiff1d(after_indices, before_indices)].assign(
+                    group=group_name
+                )
+            )
 
-            removed += [
-                player for player in before_group if player["name"] not in after_names
-            ]
-            added += [
-                player for player in after_group if player["name"] not in before_names
-            ]
+        return pd.concat(removed), pd.concat(added)
 
-        for player in removed:
-            print(
-                f"\033[31m- {player['name']} {player['weight']} {player['value']}"
-                f"\033[39m"
-            )
+    def print_differences(self, after):
+        removed, added = self.differences(after)
 
-        for player in added:
-            print(
-                f"\033[32m+ {player['name']} {player['weight']} {player['value']}"
-                f"\033[39m"
-            )
+        for player in removed.itertuples():
+            print(f"\033[31m- {player.name} {player.weight} {player.value}\033[39m")
+
+        for player in added.itertuples():
+            print(f"\033[32m+ {player.name} {player.weight} {player.value}\033[39m")
 
 
 FORWARDS_COUNT = 12
@@ -94,109 +155,462 @@ GOALIES_COUNT = 2
 PICKS_COUNT = [FORWARDS_COUNT, DEFENDERS_COUNT, GOALIES_COUNT]
 
 
-class CPSATSolver:
-    def __init__(self):
+class NoSolutionError(Exception):
+    pass
+
+
+def _column(pool, column):
+    return [group[column].to_numpy() for group in pool]
+
+
+def _replace(repeated, values):
+    """
+    Replaces the values of a repeated field of a CP-SAT model's proto.
+    """
+    repeated.clear()
+    repeated.extend(values)
+
+
+class Solver(ABC):
+    def __init__(self, prune=True):
+        self.solution = None
+        # when True, players that can't be part of an optimal team are left out before
+        # solving
+        self.prune = prune
+        # per group, the players count and how many were pruned by the last pick
+        self.pruning_stats = None
+
+    def pick_pool(self, pool, salary_cap):
+        with profiling.span("pick_pool"):
+            return self._pick_pool(pool, salary_cap, self._candidates(pool))
+
+    def pick_trades(self, solution, pool, salary_cap, trades_count):
+        with profiling.span("pick_trades"):
+            # currently picked players are never pruned since keeping them can be
+            # required to respect the trades count
+            candidates = self._candidates(pool, solution.pick_indices)
+            return self._pick_trades(
+                solution, pool, salary_cap, trades_count, candidates
+            )
+
+    @abstractmethod
+    def pick_pools(self, pool, salary_cap, count, min_distance=1):
+        """
+        Picks the count best teams that differ from each other by at least
+        min_distance players.
+
+        Solvers return teams of the same values when min_distance is 1. Above it,
+        which of the teams tied in value is picked first changes the teams too close
+        to it, so solvers can return different teams, and values, after a tie.
+        :return: the teams, best first, fewer than count when there aren't enough
+        """
+
+    @abstractmethod
+    def _pick_pool(self, pool, salary_cap, candidates):
+        pass
+
+    @abstractmethod
+    def _pick_trades(self, solution, pool, salary_cap, trades_count, candidates):
+        pass
+
+    def _candidates(self, pool, keep=None):
+        """
+        :return: per group, the sorted indices of players that are candidates
+        """
+        if keep is None:
+            keep = [[] for _ in pool]
+
+        candidates = []
+        self.pruning_stats = []
+        with profiling.span("prune"):
+            for players, count, group_keep in zip(pool, PICKS_COUNT, keep):
+                if self.prune:
+                    mask = prune_dominated(
+                        players["value"].to_numpy(),
+                        players["weight"].to_numpy(),
+                        count,
+                        group_keep,
+                    )
+                else:
+                    mask = np.ones(len(players), dtype=bool)
+
+                candidates.append(np.flatnonzero(mask))
+                self.pruning_stats.append(
+                    {"players": len(players), "pruned": int(len(players) - mask.sum())}
+                )
+
+        profiling.count(
+            "players_considered", sum(stats["players"] for stats in self.pruning_stats)
+        )
+        profiling.count(
+            "players_pruned", sum(stats["pruned"] for stats in self.pruning_stats)
+        )
+        return candidates
+
+
+class CPSATSolver(Solver):
+    def __init__(self, prune=True, num_workers=None, max_time=None, relative_gap=None):
+        """
+        :param num_workers: number of parallel search workers, defaults to CP-SAT's
+        :param max_time: time limit in seconds per solve, after which the best
+        solution found is used even if it isn't proven optimal
+        :param relative_gap: stop as soon as a solution is within this relative gap of
+        the best possible value
+        """
+        global cp_model
+        from ortools.sat.python import cp_model
+
+        super().__init__(prune)
+        self.num_workers = num_workers
+        self.max_time = max_time
+        self.relative_gap = relative_gap
         self._reset()
+        self._trade_model = None
 
     def _reset(self):
         self.model = cp_model.CpModel()
         self.solution = None
 
-    def pick_pool(self, pool, salary_cap):
-        self._reset()
+    def _pick_pool(self, pool, salary_cap, candidates):
+        with profiling.span("build_model"):
+            self._reset()
+            x = self._constrain_team_structure(pool, salary_cap, candidates)
+            self._maximize(x, pool)
 
-        x = self._constrain_team_structure(pool, salary_cap)
-        self._maximize(x, pool)
         self._solve(x, pool)
 
         return self.solution
 
-    def _constrain_team_structure(self, pool, salary_cap):
-        players_count = [len(group) for group in pool]
+    def pick_pools(self, pool, salary_cap, count, min_distance=1):
+        """
+        A single model is built, and a cut excluding every team too close to the
+        previous one is added after each solve.
+
+        Players aren't pruned, since dominated players can be part of the next best
+        teams.
+        """
+        self._reset()
+        self.pruning_stats = None
+
+        x = self._constrain_team_structure(
+            pool, salary_cap, [range(len(group)) for group in pool]
+        )
+        self._maximize(x, pool)
 
+        solutions = []
+        for _ in range(count):
+            try:
+                self._solve(x, pool)
+            except NoSolutionError:
+                # there are fewer teams than requested
+                break
+            solutions.append(self.solution)
+
+            picked = [
+                x[i, j]
+                for j, group in enumerate(self.solution.pick_indices)
+                for i in group.tolist()
+            ]
+            self.model.Add(
+                cp_model.LinearExpr.Sum(picked) <= len(picked) - min_distance
+            )
+
+        return solutions
+
+    def _constrain_team_structure(self, pool, salary_cap, candidates):
         x = {}
-        for j, players in enumerate(players_count):
-            for i in range(players):
+        for j, group_candidates in enumerate(candidates):
+            for i in map(int, group_candidates):
                 # x[i, j] = 1 if player is picked
                 x[i, j] = self.model.NewBoolVar(f"x_{i}_{j}")
 
-        for j, (players, count) in enumerate(zip(players_count, PICKS_COUNT)):
+        for j, (group_candidates, count) in enumerate(zip(candidates, PICKS_COUNT)):
             # we must have the exact player count
             self.model.Add(
-                cp_model.LinearExpr.Sum([x[i, j] for i in range(players)]) == count
+                cp_model.LinearExpr.Sum([x[int(i), j] for i in group_candidates])
+                == count
             )
 
+        weights = [group_weights.tolist() for group_weights in _column(pool, "weight")]
         self.model.Add(
             cp_model.LinearExpr.Sum(
-                [
-                    x[i, j] * pool[j][i]["weight"]
-                    for j in range(len(players_count))
-                    for i in range(players_count[j])
-                ]
+                [variable * weights[j][i] for (i, j), variable in x.items()]
             )
             <= salary_cap
         )
 
         return x
 
-    def pick_trades(self, solution, pool, salary_cap, trades_count):
-        self._reset()
-
-        x = self._constrain_team_structure(pool, salary_cap)
-
-        # we want to keep at least count(picks) - trades_count
-        picks = []
-        for i, group in enumerate(solution.pick_indices):
-            picks += [x[j, i] for j in group]
-
-        self.model.Add(
-            cp_model.LinearExpr.Sum(picks)
-            >= cp_model.LinearExpr.Sum(PICKS_COUNT) - trades_count
-        )
+    def _pick_trades(self, solution, pool, salary_cap, trades_count, candidates):
+        """
+        Picks the best team reachable from the solution with at most trades_count
+        trades. The model is kept between calls: as long as the players and their
+        weights don't change, only the objective, the keep constraint, the pruned
+        players and the solution hint are updated.
+        """
+        with profiling.span("build_model"):
+            model_key = (
+                salary_cap,
+                tuple(
+                    group_weights.tobytes() for group_weights in _column(pool, "weight")
+                ),
+            )
+            if self._trade_model is None or self._trade_model["key"] != model_key:
+                self._reset()
+                x = self._constrain_team_structure(
+                    pool, salary_cap, [range(len(group)) for group in pool]
+                )
+                self._trade_model = {
+                    "key": model_key,
+                    "model": self.model,
+                    "x": x,
+                    # its players and bounds are set by every call
+                    "keep": self.model.Add(cp_model.LinearExpr.Sum([]) >= 0).Index(),
+                }
+
+            self.model = self._trade_model["model"]
+            self.solution = None
+            x = self._trade_model["x"]
+
+            # we want to keep at least count(picks) - trades_count. The keep constraint
+            # is rewritten in place, rather than added by every call, so that the model
+            # doesn't grow and can be solved without assumptions, which would force
+            # CP-SAT to a single worker.
+            picks = []
+            for i, group in enumerate(solution.pick_indices):
+                picks += [x[j, i].Index() for j in group.tolist()]
+
+            keep = self.model.Proto().constraints[self._trade_model["keep"]].linear
+            _replace(keep.vars, picks)
+            _replace(keep.coeffs, [1] * len(picks))
+            _replace(keep.domain, [sum(PICKS_COUNT) - trades_count, sum(PICKS_COUNT)])
+
+            # pruned players are left out by fixing their variables to 0, and the
+            # players pruned by a previous call are freed again
+            candidates = [set(group_candidates) for group_candidates in candidates]
+            variables = self.model.Proto().variables
+            for (i, j), variable in x.items():
+                _replace(
+                    variables[variable.Index()].domain,
+                    [0, 1] if i in candidates[j] else [0, 0],
+                )
+
+            # the current team is always feasible, so it's a good starting point
+            picked = [set(group.tolist()) for group in solution.pick_indices]
+            self.model.ClearHints()
+            for (i, j), variable in x.items():
+                self.model.AddHint(variable, i in picked[j])
+
+            self.model.ClearObjective()
+            self._maximize(x, pool)
 
-        self._maximize(x, pool)
         self._solve(x, pool)
 
         return self.solution
 
     def _maximize(self, x, pool):
+        values = [group_values.tolist() for group_values in _column(pool, "value")]
+
         expressions = []
         coefficients = []
-        for j, players in enumerate(pool):
-            for i in range(len(players)):
-                expressions.append(x[i, j])
-                coefficients.append(players[i]["value"])
+        for (i, j), variable in x.items():
+            expressions.append(variable)
+            coefficients.append(values[j][i])
 
         self.model.Maximize(cp_model.LinearExpr.WeightedSum(expressions, coefficients))
 
     def _solve(self, x, pool):
         solver = cp_model.CpSolver()
-        status = solver.Solve(self.model)
-
-        if status != cp_model.OPTIMAL:
-            raise "No optimal solution."
+        if self.num_workers is not None:
+            solver.parameters.num_workers = self.num_workers
+        if self.max_time is not None:
+            solver.parameters.max_time_in_seconds = self.max_time
+        if self.relative_gap is not None:
+            solver.parameters.relative_gap_limit = self.relative_gap
+
+        with profiling.span("solve"):
+            status = solver.Solve(self.model)
+
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            raise NoSolutionError(f"No solution found ({solver.StatusName(status)}).")
+
+        # an optimal status is also returned when stopping within relative_gap
+        bound = solver.BestObjectiveBound()
+        gap = abs(bound - solver.ObjectiveValue()) / max(abs(bound), 1)
+
+        profiling.record_solve(
+            status=solver.StatusName(status),
+            variables=len(x),
+            wall_time=solver.WallTime(),
+            user_time=solver.UserTime(),
+            branches=solver.NumBranches(),
+            conflicts=solver.NumConflicts(),
+            objective=solver.ObjectiveValue(),
+            bound=bound,
+            gap=gap,
+        )
 
-        picks = [[], [], []]
         pick_indices = [[], [], []]
-        for j, players in enumerate(pool):
-            for i in range(len(players)):
-                if solver.BooleanValue(x[i, j]):
-                    picks[j].append(players[i])
-                    pick_indices[j].append(i)
+        for (i, j), variable in sorted(x.items(), key=lambda item: item[0][::-1]):
+            if solver.BooleanValue(variable):
+                pick_indices[j].append(i)
 
-        self.solution = Solution(picks, pick_indices)
+        self.solution = Solution(pool, pick_indices, solver.WallTime(), gap)
 
-    def translate_to_data(self, players):
-        picks = [[], [], []]
-        pick_indices = [[], [], []]
-        for i, (picked_players, players) in enumerate(
-            zip(self.solution.picks(), players)
-        ):
-            for picked_player in picked_players:
-                for j, player in players.iterrows():
-                    if picked_player["name"] == player["name"]:
-                        picks[i].append(player)
-                        pick_indices[i].append(j)
-                        break
-
-        return Solution(picks, pick_indices)
+
+class KnapsackSolver(Solver):
+    """
+    Exact dynamic programming solver in pure NumPy. It avoids the overhead of setting
+    up CP-SAT for every solve, but requires integral, non-negative player values.
+    """
+
+    def _pick_pool(self, pool, salary_cap, candidates):
+        return self._solve(pool, salary_cap, candidates)
+
+    def _pick_trades(self, solution, pool, salary_cap, trades_count, candidates):
+        # keeping at least count(picks) - trades_count players is the same as picking
+        # at most trades_count players that aren't already picked
+        return self._solve(
+            pool, salary_cap, candidates, solution.pick_indices, trades_count
+        )
+
+    def pick_pools(self, pool, salary_cap, count, min_distance=1):
+        """
+        Teams are found from the best down, like with Lawler's k-best algorithm: once
+        a team is found, the teams left are split in parts, the k-th part keeping the
+        team's first k - 1 players and leaving out its k-th one. The best team of
+        every part is then solved for with its kept players already picked. Teams too
+        close to a picked one are skipped, and parts keeping too many of a picked
+        team's players aren't solved at all.
+
+        Players aren't pruned, since dominated players can be part of the next best
+        teams.
+        """
+        self.pruning_stats = None
+        max_shared = sum(PICKS_COUNT) - min_distance
+
+        # best teams of the parts left, as (-value, order, solution, kept, left out),
+        # where players are (position in group, group) pairs
+        parts = []
+        order = itertools.count()
+
+        def solve_part(kept, left_out):
+            solution = self._solve_part(pool, salary_cap, kept, left_out)
+            if solution is not None:
+                heapq.heappush(
+                    parts, (-solution.value(), next(order), solution, kept, left_out)
+                )
+
+        solve_part(frozenset(), frozenset())
+        solutions = []
+        teams = []
+        while parts and len(solutions) < count:
+            _, _, solution, kept, left_out = heapq.heappop(parts)
+            team = {
+                (i, j)
+                for j, indices in enumerate(solution.pick_indices)
+                for i in indices.tolist()
+            }
+            if all(len(team & other) <= max_shared for other in teams):
+                solutions.append(solution)
+                teams.append(team)
+
+            for player in sorted(team - kept):
+                if all(len(kept & other) <= max_shared for other in teams):
+                    solve_part(kept, left_out | {player})
+                kept = kept | {player}
+
+        if solutions:
+            self.solution = solutions[0]
+        return solutions
+
+    def _solve_part(self, pool, salary_cap, kept, left_out):
+        """
+        :param kept: players that are picked beforehand
+        :param left_out: players that can't be picked
+        :return: the best team picking the kept players, or None when there isn't any
+        """
+        start = time.perf_counter()
+
+        kept_indices = []
+        candidates = []
+        counts = []
+        for j, (group, count) in enumerate(zip(pool, PICKS_COUNT)):
+            group_kept = sorted(i for i, group_j in kept if group_j == j)
+            group_left_out = [i for i, group_j in left_out if group_j == j]
+            kept_indices.append(np.array(group_kept, dtype=np.int64))
+            candidates.append(
+                np.setdiff1d(np.arange(len(group)), group_kept + group_left_out)
+            )
+            counts.append(count - len(group_kept))
+
+        weights = _column(pool, "weight")
+        candidate_indices = knapsack.solve(
+            [
+                values[group_candidates]
+                for values, group_candidates in zip(_column(pool, "value"), candidates)
+            ],
+            [
+                group_weights[group_candidates]
+                for group_weights, group_candidates in zip(weights, candidates)
+            ],
+            counts,
+            salary_cap
+            - sum(
+                group_weights[indices].sum()
+                for group_weights, indices in zip(weights, kept_indices)
+            ),
+        )
+        if candidate_indices is None:
+            return None
+
+        pick_indices = [
+            np.sort(np.concatenate([indices, group_candidates[picks]]))
+            for indices, group_candidates, picks in zip(
+                kept_indices, candidates, candidate_indices
+            )
+        ]
+        return Solution(pool, pick_indices, time.perf_counter() - start)
+
+    def _solve(self, pool, salary_cap, candidates, incumbents=None, max_new=None):
+        start = time.perf_counter()
+
+        if incumbents is not None:
+            # positions of the incumbents among candidates, which always include them
+            incumbents = [
+                np.searchsorted(group_candidates, group_incumbents)
+                for group_candidates, group_incumbents in zip(candidates, incumbents)
+            ]
+
+        candidate_indices = knapsack.solve(
+            [
+                values[group_candidates]
+                for values, group_candidates in zip(_column(pool, "value"), candidates)
+            ],
+            [
+                weights[group_candidates]
+                for weights, group_candidates in zip(
+                    _column(pool, "weight"), candidates
+                )
+            ],
+            PICKS_COUNT,
+            salary_cap,
+            incumbents,
+            max_new,
+        )
+        if candidate_indices is None:
+            raise NoSolutionError("No solution found.")
+
+        pick_indices = [
+            group_candidates[indices]
+            for group_candidates, indices in zip(candidates, candidate_indices)
+        ]
+        self.solution = Solution(pool, pick_indices, time.perf_counter() - start)
+
+        return self.solution
+
+
+SOLVERS = {
+    "cpsat": CPSATSolver,
+    "knapsack": KnapsackSolver,
+}
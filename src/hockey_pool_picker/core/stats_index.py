@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from hockey_pool_picker.core.game_events import GAME_STATS_COLUMNS, GameEvents
+
+
+class DailyStatsIndex:
+    """
+    Dense (player x day) cumulative sums of every game stat over a season. Stats over
+    any window of days are answered with two lookups and a subtraction, instead of
+    filtering the games for each window.
+
+    Windows are day-granular: a game is counted if it was played on a day between the
+    start and end dates, inclusively.
+    """
+
+    def __init__(self, games: pd.DataFrame):
+        events = GameEvents(games)
+
+        self.first_day = games["date"].min().normalize()
+        self.days_count = (games["date"].max().normalize() - self.first_day).days + 1
+
+        # column of the pool identifying players, see GameEvents
+        self.key = events.key
+        self.names = pd.Index(
+            pd.concat(
+                [
+                    events.goals[self.key],
+                    events.assists[self.key],
+                    events.goalies[self.key],
+                ]
+            ).unique()
+        )
+
+        self._cumulative = {}
+        self._accumulate("goals", events.goals)
+        self._accumulate("assists", events.assists)
+        self._accumulate("wins", events.goalies, "wins")
+        self._accumulate("shutouts", events.goalies, "shutouts")
+        self._accumulate("games_played", events.goalies)
+
+        # the mean saves percent over a window is rebuilt from its sum and count
+        with_saves_percent = events.goalies.dropna(subset=["saves_percent"])
+        self._accumulate("saves_percent_sum", with_saves_percent, "saves_percent")
+        self._accumulate("saves_percent_count", with_saves_percent)
+
+    def _accumulate(self, stat, events, column=None):
+        players = self.names.get_indexer(events[self.key])
+        days = (events["date"].dt.normalize() - self.first_day).dt.days.to_numpy()
+
+        daily = np.zeros((len(self.names), self.days_count + 1))
+        # daily[:, 0] stays empty so that a window starting on the first day can
+        # subtract it
+        np.add.at(
+            daily,
+            (players, days + 1),
+            1 if column is None else events[column].to_numpy(dtype=float),
+        )
+
+        self._cumulative[stat] = np.cumsum(daily, axis=1)
+
+    def _day(self, date):
+        day = (pd.Timestamp(date).normalize() - self.first_day).days
+        return min(max(day, 0), self.days_count)
+
+    def window(self, stat, start, end) -> np.ndarray:
+        """
+        Sum of a stat between start and end, inclusively, for every player in `names`,
+        which holds the players' keys.
+        """
+        cumulative = self._cumulative[stat]
+        start_day = self._day(start)
+        end_day = max(self._day(pd.Timestamp(end) + pd.Timedelta(days=1)), start_day)
+        return cumulative[:, end_day] - cumulative[:, start_day]
+
+    def stats(self, start, end) -> pd.DataFrame:
+        """
+        Per-player stats for games played between start and end, inclusively, indexed
+        by the player's key.
+        """
+        stats = pd.DataFrame(
+            {
+                column: self.window(column, start, end).astype(int)
+                for column in GAME_STATS_COLUMNS[:-1]
+            },
+            index=self.names,
+        )
+
+        saves_percent_sum = self.window("saves_percent_sum", start, end)
+        saves_percent_count = self.window("saves_percent_count", start, end)
+        stats["saves_percent"] = np.divide(
+            saves_percent_sum,
+            saves_percent_count,
+            out=np.zeros(len(self.names)),
+            where=saves_percent_count > 0,
+        )
+
+        return stats
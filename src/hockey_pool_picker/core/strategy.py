@@ -1,9 +1,20 @@
-from abc import abstractmethod, ABC
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from typing import ClassVar
 
 import numpy as np
+import pandas as pd
+
+# per player type, the points given for one of each stat
+Coefficients = Mapping[str, Mapping[str, float]]
 
 
 class ValueStrategy(ABC):
+    # coefficients of the player types valued linearly, which evaluate_strategies
+    # evaluates together. Player types missing from it aren't linear, e.g. when their
+    # value involves a threshold.
+    coefficients: ClassVar[Coefficients] = {}
+
     def apply(self, player, player_type):
         return {
             "forward": self.forward,
@@ -11,6 +22,13 @@ class ValueStrategy(ABC):
             "goalie": self.goalie,
         }[player_type](player)
 
+    def _linear_value(self, player, player_type):
+        coefficients = self.coefficients[player_type]
+        self.expect_columns(player, player_type, coefficients)
+        return sum(
+            player[column] * coefficient for column, coefficient in coefficients.items()
+        )
+
     @abstractmethod
     def forward(self, player):
         pass
@@ -32,38 +50,34 @@ class ValueStrategy(ABC):
 
 
 class MarqueurValueStrategy(ValueStrategy):
+    coefficients: ClassVar[Coefficients] = {
+        "forward": {"goals": 2, "assists": 1},
+        "defender": {"goals": 3, "assists": 2},
+        "goalie": {"wins": 3, "shutouts": 5, "goals": 5, "assists": 2},
+    }
+
     def forward(self, player):
-        self.expect_columns(player, "forward", ["goals", "assists"])
-        return (player["goals"] * 2) + player["assists"]
+        return self._linear_value(player, "forward")
 
     def defender(self, player):
-        self.expect_columns(player, "defender", ["goals", "assists"])
-        return (player["goals"] * 3) + (player["assists"] * 2)
+        return self._linear_value(player, "defender")
 
     def goalie(self, player):
-        self.expect_columns(player, "goalie", ["wins", "shutouts", "goals", "assists"])
-        return (
-            player["wins"] * 3
-            + (player["shutouts"] * 5)
-            + (player["goals"] * 5)
-            + (player["assists"] * 2)
-        )
+        return self._linear_value(player, "goalie")
 
 
 class MarqueurWithDoubledDefendersStrategy(MarqueurValueStrategy):
-    def defender(self, player):
-        self.expect_columns(player, "defender", ["goals", "assists"])
-        return ((player["goals"] * 3) + (player["assists"] * 2)) * 2
+    coefficients: ClassVar[Coefficients] = {
+        **MarqueurValueStrategy.coefficients,
+        "defender": {"goals": 6, "assists": 4},
+    }
 
 
 class MoneyballStrategy(MarqueurValueStrategy):
-    def forward(self, player):
-        self.expect_columns(player, "forward", ["assists"])
-        return player["assists"]
-
-    def defender(self, player):
-        self.expect_columns(player, "defender", ["assists"])
-        return player["assists"]
+    coefficients: ClassVar[Coefficients] = {
+        "forward": {"assists": 1},
+        "defender": {"assists": 1},
+    }
 
     def goalie(self, player):
         self.expect_columns(player, "goalie", ["saves_percent"])
@@ -73,26 +87,34 @@ class MoneyballStrategy(MarqueurValueStrategy):
 
 
 class MarqueurMinusGamblingValueStrategy(MarqueurValueStrategy):
-    def goalie(self, player):
-        self.expect_columns(player, "goalie", ["wins", "shutouts"])
-        return (player["wins"] * 2) + (player["shutouts"] * 3)
+    coefficients: ClassVar[Coefficients] = {
+        **MarqueurValueStrategy.coefficients,
+        "goalie": {"wins": 2, "shutouts": 3},
+    }
+
+
+# This is definitely not the best way to normalize the forward/defender data with goalies
+POINTS_TO_PERCENTAGE = 1000 / 250
 
 
 class MarqueurWithPercentageStrategy(ValueStrategy):
+    coefficients: ClassVar[Coefficients] = {
+        "forward": {"goals": 2 * POINTS_TO_PERCENTAGE, "assists": POINTS_TO_PERCENTAGE},
+        "defender": {
+            "goals": 3 * POINTS_TO_PERCENTAGE,
+            "assists": 2 * POINTS_TO_PERCENTAGE,
+        },
+    }
+
     def __init__(self, minimum_games=52):
         super().__init__()
         self.minimum_games = minimum_games
 
     def forward(self, player):
-        self.expect_columns(player, "forward", ["goals", "assists"])
-        points = (player["goals"] * 2) + player["assists"]
-        # This is definitely not the best way to normalize the forward/defender data with goalies
-        return (points / 250) * 1000
+        return self._linear_value(player, "forward")
 
     def defender(self, player):
-        self.expect_columns(player, "defender", ["goals", "assists"])
-        points = (player["goals"] * 3) + (player["assists"] * 2)
-        return (points / 250) * 1000
+        return self._linear_value(player, "defender")
 
     def goalie(self, player):
         self.expect_columns(player, "goalie", ["games_played", "saves_percent"])
@@ -110,3 +132,37 @@ STRATEGIES = {
     "marqueur_with_percentage": MarqueurWithPercentageStrategy,
     "moneyball": MoneyballStrategy,
 }
+
+
+def evaluate_strategies(players, player_type, strategies) -> pd.DataFrame:
+    """
+    Values players under many strategies at once. Strategies that are linear for the
+    player type are evaluated together as a single (players x stats) @ (stats x
+    strategies) product, and the others one at a time.
+    :param strategies: strategies keyed by name
+    :return: a dataframe of values with one column per strategy, indexed like players
+    """
+    linear = {
+        name: strategy.coefficients[player_type]
+        for name, strategy in strategies.items()
+        if player_type in strategy.coefficients
+    }
+    columns = list(dict.fromkeys(column for c in linear.values() for column in c))
+    for name, coefficients in linear.items():
+        strategies[name].expect_columns(players, player_type, coefficients)
+
+    matrix = np.array(
+        [[c.get(column, 0) for c in linear.values()] for column in columns],
+        dtype=float,
+    ).reshape(len(columns), len(linear))
+    stats = players[columns].to_numpy()
+    # integer stats and points keep integer values, like the strategies' own apply
+    if np.issubdtype(stats.dtype, np.integer) and (matrix == np.round(matrix)).all():
+        matrix = matrix.astype(np.int64)
+
+    values = pd.DataFrame(stats @ matrix, index=players.index, columns=list(linear))
+    for name, strategy in strategies.items():
+        if name not in linear:
+            values[name] = np.asarray(strategy.apply(players, player_type))
+
+    return values[list(strategies)]
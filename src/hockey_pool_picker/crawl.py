@@ -1,11 +1,20 @@
 import argparse
 from hockey_pool_picker.core.season import Season
+from hockey_pool_picker.sources import season_cache
 from hockey_pool_picker.sources.games.hockey_reference import HockeyReferenceGamesSource
 from hockey_pool_picker.sources.stats.hockey_reference import HockeyReferencePlayersSource
 from hockey_pool_picker.sources.cap_hit.marqueur import MarqueurCapHitSource
+from hockey_pool_picker.sources.players import register_players
 
 
-def crawl(seasons=None, crawlers=None):
+def crawl(
+    seasons=None,
+    crawlers=None,
+    concurrency=None,
+    incremental=False,
+    from_cache=False,
+    workers=None,
+):
     if seasons is None:
         seasons = [2021, 2022, 2023]
 
@@ -20,10 +29,24 @@ def crawl(seasons=None, crawlers=None):
         for crawler in crawlers:
             if crawler == "marqueur":
                 MarqueurCapHitSource(season).crawl()
+            elif crawler == "hockey_reference" and from_cache:
+                HockeyReferenceGamesSource(season).rebuild_from_cache(workers)
+                HockeyReferencePlayersSource(season).rebuild_from_cache(workers)
             elif crawler == "hockey_reference":
-                HockeyReferenceGamesSource(season).crawl()
+                if concurrency is None:
+                    HockeyReferenceGamesSource(season).crawl(incremental=incremental)
+                else:
+                    HockeyReferenceGamesSource(season).crawl_concurrently(
+                        concurrency, incremental=incremental
+                    )
                 HockeyReferencePlayersSource(season).crawl()
 
+        # crawled files replace the ones that may have been loaded
+        season_cache.invalidate(season)
+
+        if "hockey_reference" in crawlers:
+            register_players(season)
+
 
 def parse_args():
     parser = argparse.ArgumentParser()
@@ -41,9 +64,42 @@ def parse_args():
         choices=["hockey_reference", "marqueur"],
         help="List of crawlers to use",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Crawl games with this many concurrent requests, still rate limited, "
+        "resuming interrupted crawls. Games are crawled one at a time by default.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only crawl Hockey Reference games missing from the games files, e.g. to "
+        "refresh an ongoing season.",
+    )
+    parser.add_argument(
+        "--from_cache",
+        action="store_true",
+        help="Rebuild the Hockey Reference files from the pages already in the request "
+        "cache, without crawling, e.g. after fixing a parser.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of processes parsing pages with --from_cache. Defaults to the "
+        "number of CPUs.",
+    )
     return parser.parse_args()
 
 
 if __name__ == "__main__":
     args = parse_args()
-    crawl(seasons=args.seasons, crawlers=args.crawlers)
+    crawl(
+        seasons=args.seasons,
+        crawlers=args.crawlers,
+        concurrency=args.concurrency,
+        incremental=args.incremental,
+        from_cache=args.from_cache,
+        workers=args.workers,
+    )
@@ -1,27 +1,93 @@
 import argparse
 
+from hockey_pool_picker import profiling
 from hockey_pool_picker.core.season import Season, SEASONS_CAP_HIT
 from hockey_pool_picker.sources.backtest import BacktestingSource
 from hockey_pool_picker.sources.players import PlayersSource
 from hockey_pool_picker.core.strategy import STRATEGIES
-from hockey_pool_picker.core.solver import CPSATSolver
+from hockey_pool_picker.core.solver import SOLVERS, NoSolutionError
+from hockey_pool_picker.profiling import add_profile_argument, profiled
+from hockey_pool_picker.run_store import add_store_arguments, run_store
+from hockey_pool_picker.solver_arguments import (
+    add_solver_parameters_arguments,
+    check_solver_parameters,
+    solver_parameters,
+)
 
 
-def pick_pool(season_start=2022, evaluation_strategy='marqueur', picking_strategy='marqueur'):
+def pick_pool(
+    season_start=2022,
+    evaluation_strategy="marqueur",
+    picking_strategy="marqueur",
+    solver="cpsat",
+    solver_parameters=None,
+    lineups=1,
+    min_distance=1,
+    store=None,
+    verbose=True,
+):
+    """
+    :param store: RunStore the picks are recorded to, if any
+    :param verbose: print the picked lineups
+    """
+    parameters = {
+        "season": season_start,
+        "evaluation_strategy": evaluation_strategy,
+        "picking_strategy": picking_strategy,
+        "solver": solver,
+        "solver_parameters": solver_parameters or {},
+        "lineups": lineups,
+        "min_distance": min_distance,
+    }
     season = Season(start=season_start)
     source = BacktestingSource(season, PlayersSource)
 
-    past_pool, _ = source.load(
-        STRATEGIES[picking_strategy](), STRATEGIES[evaluation_strategy]()
-    )
+    with profiling.span("load"):
+        past_pool, _ = source.load(
+            STRATEGIES[picking_strategy](), STRATEGIES[evaluation_strategy]()
+        )
 
-    solver = CPSATSolver()
-    solution = solver.pick_pool(
-        [group.to_dict("records") for group in past_pool], SEASONS_CAP_HIT[season_start]
-    )
+    solver = SOLVERS[solver](**(solver_parameters or {}))
+
+    if lineups == 1:
+        try:
+            solutions = [solver.pick_pool(past_pool, SEASONS_CAP_HIT[season_start])]
+        except NoSolutionError:
+            solutions = []
+    else:
+        with profiling.span("pick_pools"):
+            solutions = solver.pick_pools(
+                past_pool, SEASONS_CAP_HIT[season_start], lineups, min_distance
+            )
+
+    if not solutions:
+        print(f"No feasible lineup under the salary cap of season {season}")
+        return
+
+    if verbose:
+        if lineups == 1:
+            print("pick:")
+            solutions[0].print()
+        else:
+            for i, solution in enumerate(solutions):
+                print(f"pick #{i + 1} (solved in {solution.solve_time:.2f}s):")
+                solution.print()
+                print()
 
-    print("pick:")
-    solution.print()
+    if store is not None:
+        # the best lineup is the pick, the next ones are numbered from 2
+        store.record(
+            "pick_pool",
+            parameters,
+            total_value=solutions[0].value(),
+            lineups={
+                "pick" if i == 0 else f"pick_{i + 1}": solution.lineup()
+                for i, solution in enumerate(solutions)
+            },
+            timings={
+                "pick_solve_time": sum(solution.solve_time for solution in solutions)
+            },
+        )
 
 
 def parse_args():
@@ -49,14 +115,50 @@ def parse_args():
         choices=STRATEGIES.keys(),
         help="Picking strategy. This is the strategy used to pick the initial pool of players.",
     )
+    parser.add_argument(
+        "--solver",
+        type=str,
+        default="cpsat",
+        choices=SOLVERS.keys(),
+        help="Solver used to pick the pool.",
+    )
+    parser.add_argument(
+        "--lineups",
+        type=int,
+        default=1,
+        help="Number of best lineups to pick.",
+    )
+    parser.add_argument(
+        "--min_distance",
+        type=int,
+        default=1,
+        help="Minimum number of different players between picked lineups.",
+    )
+    add_solver_parameters_arguments(parser)
+    add_profile_argument(parser)
+    add_store_arguments(parser)
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Don't print the picked lineups, e.g. when reading them from the store.",
+    )
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    check_solver_parameters(parser, args)
+    return args
 
 
 if __name__ == "__main__":
     args = parse_args()
-    pick_pool(
-        season_start=args.season,
-        evaluation_strategy=args.evaluation_strategy,
-        picking_strategy=args.picking_strategy
-    )
+    with profiled(args.profile):
+        pick_pool(
+            season_start=args.season,
+            evaluation_strategy=args.evaluation_strategy,
+            picking_strategy=args.picking_strategy,
+            solver=args.solver,
+            solver_parameters=solver_parameters(args),
+            lineups=args.lineups,
+            min_distance=args.min_distance,
+            store=run_store(args),
+            verbose=not args.quiet,
+        )
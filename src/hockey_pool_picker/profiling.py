@@ -0,0 +1,162 @@
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class Profiler:
+    """
+    Collects how long the stages of a run take, counters of what they processed and
+    the statistics of every solve.
+
+    Spans nest: a span opened inside another is reported under it, e.g.
+    "backtest/load/players", so the same stage reached from different places is told
+    apart.
+    """
+
+    def __init__(self):
+        # span path -> calls, total and max seconds
+        self.spans = {}
+        self.counters = {}
+        self.solves = []
+        self._stack = []
+
+    @contextmanager
+    def span(self, name):
+        self._stack.append(name)
+        path = "/".join(self._stack)
+        # spans are stored as they're first opened, so every span follows its parent
+        stats = self.spans.setdefault(path, {"calls": 0, "total": 0.0, "max": 0.0})
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+
+            stats["calls"] += 1
+            stats["total"] += elapsed
+            stats["max"] = max(stats["max"], elapsed)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_solve(self, **stats):
+        self.solves.append({"span": "/".join(self._stack), **stats})
+
+    def to_dict(self):
+        return {"spans": self.spans, "counters": self.counters, "solves": self.solves}
+
+    def write(self, path):
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def summary(self) -> str:
+        lines = [
+            f"{'stage':<48} {'calls':>6} {'total s':>9} {'mean ms':>9} {'max ms':>9}"
+        ]
+        for path, stats in self.spans.items():
+            depth = path.count("/")
+            name = "  " * depth + path.rsplit("/", 1)[-1]
+            lines.append(
+                f"{name:<48} {stats['calls']:>6} {stats['total']:>9.3f} "
+                f"{stats['total'] / stats['calls'] * 1000:>9.1f} "
+                f"{stats['max'] * 1000:>9.1f}"
+            )
+
+        if self.counters:
+            lines.append("")
+            for name, value in self.counters.items():
+                lines.append(f"{name:<48} {value:>6}")
+
+        if self.solves:
+            lines.append("")
+            wall_time = sum(solve["wall_time"] for solve in self.solves)
+            branches = sum(solve["branches"] for solve in self.solves)
+            conflicts = sum(solve["conflicts"] for solve in self.solves)
+            gap = max(solve["gap"] for solve in self.solves)
+            lines.append(
+                f"{len(self.solves)} solves in {wall_time:.3f}s, {branches} branches, "
+                f"{conflicts} conflicts, max gap {gap:.4f}"
+            )
+
+        return "\n".join(lines)
+
+
+_profiler = None
+
+
+def enable() -> Profiler:
+    """
+    Starts profiling the process, forgetting any previous profile.
+    """
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+
+def disable():
+    global _profiler
+    _profiler = None
+
+
+def profiler() -> Profiler | None:
+    """
+    :return: the current profile, or None when profiling is disabled
+    """
+    return _profiler
+
+
+# the helpers below do nothing when profiling is disabled, so that they can stay in
+# hot paths
+
+
+def span(name):
+    """
+    Times the stage run within the returned context.
+    """
+    if _profiler is None:
+        return nullcontext()
+    return _profiler.span(name)
+
+
+def count(name, amount=1):
+    if _profiler is not None:
+        _profiler.count(name, amount)
+
+
+def record_solve(**stats):
+    if _profiler is not None:
+        _profiler.record_solve(**stats)
+
+
+def add_profile_argument(parser):
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="FILE",
+        help="Print the time spent in every stage of the run and the solvers' "
+        "statistics, and write them as JSON to FILE when given.",
+    )
+
+
+@contextmanager
+def profiled(profile):
+    """
+    Profiles the run within the context when asked to with --profile.
+    :param profile: the --profile argument
+    """
+    if profile is None:
+        yield
+        return
+
+    current = enable()
+    try:
+        yield
+    finally:
+        disable()
+        print()
+        print(current.summary())
+        if profile:
+            current.write(profile)
@@ -0,0 +1,292 @@
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from hockey_pool_picker.sources.data_dir import data_dir
+
+base_dir = Path(__file__).parent.parent.parent
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    created TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    total_value REAL,
+    timings TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS period_values (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    position INTEGER NOT NULL,
+    period TEXT NOT NULL,
+    value REAL NOT NULL,
+    trades_solve_time REAL
+);
+CREATE TABLE IF NOT EXISTS lineups (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    stage TEXT NOT NULL,
+    player_group TEXT NOT NULL,
+    name TEXT NOT NULL,
+    player_id INTEGER,
+    value REAL,
+    weight INTEGER
+);
+CREATE TABLE IF NOT EXISTS trades (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    period TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    player_group TEXT NOT NULL,
+    name TEXT NOT NULL,
+    player_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS period_values_run ON period_values (run_id);
+CREATE INDEX IF NOT EXISTS lineups_run ON lineups (run_id, stage);
+CREATE INDEX IF NOT EXISTS trades_run ON trades (run_id);
+"""
+
+LINEUP_COLUMNS = ["player_group", "name", "player_id", "value", "weight"]
+
+
+class RunStore:
+    """
+    Append-only SQLite store of the results of runs: their parameters, the values of
+    every period, the lineups picked, the trades made and how long solving took.
+    Runs are only ever added, so results of different runs, e.g. thousands of grid
+    runs, can be compared with the query helpers or SQL.
+    """
+
+    def __init__(self, path="runs/runs.sqlite"):
+        self.file = data_dir(base_dir) / Path(path)
+
+    def _connect(self):
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.file)
+        connection.executescript(SCHEMA)
+        return connection
+
+    def record(
+        self,
+        kind,
+        parameters,
+        total_value=None,
+        period_values=None,
+        lineups=None,
+        trades=None,
+        trades_solve_times=None,
+        timings=None,
+    ) -> int:
+        """
+        :param kind: what was run, e.g. backtest or pick_pool
+        :param parameters: the run's parameters, as JSON-serializable values
+        :param period_values: value of the team, keyed by period
+        :param lineups: teams picked, see Solution.lineup, keyed by stage, e.g. pick
+        or a period
+        :param trades: per period, the players removed and added, see
+        Solution.differences
+        :param trades_solve_times: per period, the time spent picking its trades
+        :param timings: durations in seconds, e.g. solve times
+        :return: the run's id
+        """
+        return self.record_many(
+            [
+                {
+                    "kind": kind,
+                    "parameters": parameters,
+                    "total_value": total_value,
+                    "period_values": period_values,
+                    "lineups": lineups,
+                    "trades": trades,
+                    "trades_solve_times": trades_solve_times,
+                    "timings": timings,
+                }
+            ]
+        )[0]
+
+    def record_many(self, runs) -> list[int]:
+        """
+        Records runs in a single transaction, e.g. every run of a grid.
+        :param runs: the arguments of record for every run
+        :return: the runs' ids
+        """
+        created = datetime.now().isoformat(timespec="seconds")
+        run_ids = []
+        with self._connect() as connection:
+            for run in runs:
+                run_ids.append(self._insert(connection, created, **run))
+        connection.close()
+        return run_ids
+
+    @staticmethod
+    def _insert(
+        connection,
+        created,
+        kind,
+        parameters,
+        total_value=None,
+        period_values=None,
+        lineups=None,
+        trades=None,
+        trades_solve_times=None,
+        timings=None,
+    ):
+        run_id = connection.execute(
+            "INSERT INTO runs (kind, created, parameters, total_value, timings) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                kind,
+                created,
+                json.dumps(parameters),
+                None if total_value is None else float(total_value),
+                json.dumps(timings or {}),
+            ),
+        ).lastrowid
+
+        trades_solve_times = trades_solve_times or {}
+        connection.executemany(
+            "INSERT INTO period_values VALUES (?, ?, ?, ?, ?)",
+            [
+                (run_id, position, period, float(value), trades_solve_times.get(period))
+                for position, (period, value) in enumerate(
+                    (period_values or {}).items()
+                )
+            ],
+        )
+
+        for stage, lineup in (lineups or {}).items():
+            connection.executemany(
+                "INSERT INTO lineups VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, stage, *row) for row in _rows(lineup, LINEUP_COLUMNS)],
+            )
+
+        for period, (removed, added) in (trades or {}).items():
+            for direction, players in [("out", removed), ("in", added)]:
+                connection.executemany(
+                    "INSERT INTO trades VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (run_id, period, direction, *row)
+                        for row in _rows(players, ["player_group", "name", "player_id"])
+                    ],
+                )
+
+        return run_id
+
+    def _query(self, sql, parameters=()) -> pd.DataFrame:
+        with self._connect() as connection:
+            df = pd.read_sql_query(sql, connection, params=parameters)
+        connection.close()
+        return df
+
+    def runs(self, kind=None, **parameters) -> pd.DataFrame:
+        """
+        :param parameters: only keep runs with these parameter values, e.g.
+        picking_strategy="moneyball"
+        :return: one row per run, with a column per parameter and timing
+        """
+        conditions = []
+        values = []
+        if kind is not None:
+            conditions.append("kind = ?")
+            values.append(kind)
+        for name, value in parameters.items():
+            conditions.append("json_extract(parameters, ?) = ?")
+            values += [f"$.{name}", value]
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        runs = self._query(f"SELECT * FROM runs {where} ORDER BY id", values)
+        expanded = [
+            pd.json_normalize(runs[column].map(json.loads).tolist()).set_index(
+                runs.index
+            )
+            for column in ["parameters", "timings"]
+        ]
+        return pd.concat(
+            [runs.drop(columns=["parameters", "timings"]), *expanded], axis=1
+        )
+
+    def period_values(self, run_ids) -> pd.DataFrame:
+        """
+        :return: the value of every period, with a row per period and a column per
+        run, to compare runs period by period
+        """
+        run_ids = list(run_ids)
+        placeholders = ", ".join("?" * len(run_ids))
+        values = self._query(
+            f"SELECT run_id, position, period, value FROM period_values "
+            f"WHERE run_id IN ({placeholders})",
+            run_ids,
+        )
+        return (
+            values.pivot_table(
+                index=["position", "period"], columns="run_id", values="value"
+            )
+            .reset_index(level="position", drop=True)
+            .reindex(columns=run_ids)
+        )
+
+    def lineup(self, run_id, stage="pick") -> pd.DataFrame:
+        return self._query(
+            "SELECT player_group, name, player_id, value, weight FROM lineups "
+            "WHERE run_id = ? AND stage = ?",
+            (run_id, stage),
+        )
+
+    def trades(self, run_id) -> pd.DataFrame:
+        return self._query(
+            "SELECT period, direction, player_group, name, player_id FROM trades "
+            "WHERE run_id = ?",
+            (run_id,),
+        )
+
+
+def simulation_record(season_simulator, pick) -> dict:
+    """
+    :param pick: the solution picked before the season
+    :return: the results of a simulated season, as arguments of RunStore.record
+    """
+    lineups = {"pick": pick, **season_simulator.lineups}
+    return {
+        "total_value": season_simulator.total_value(),
+        "period_values": season_simulator.period_values,
+        # lineups are kept without their pools, which are costly to send between
+        # processes
+        "lineups": {stage: solution.lineup() for stage, solution in lineups.items()},
+        "trades": season_simulator.trades,
+        "trades_solve_times": season_simulator.trade_solve_times,
+        "timings": {
+            "pick_solve_time": pick.solve_time,
+            "trades_solve_time": sum(season_simulator.trade_solve_times.values()),
+        },
+    }
+
+
+def _rows(df, columns):
+    """
+    :return: the rows of the columns, with missing columns and values as None
+    """
+    df = df.rename(columns={"group": "player_group"})
+    df = df.reindex(columns=columns).astype(object)
+    return df.where(df.notna(), None).itertuples(index=False, name=None)
+
+
+def add_store_arguments(parser):
+    parser.add_argument(
+        "--store",
+        type=str,
+        default="runs/runs.sqlite",
+        help="SQLite file within the data folder that results are recorded to.",
+    )
+    parser.add_argument(
+        "--no_store",
+        action="store_true",
+        help="Don't record results.",
+    )
+
+
+def run_store(args) -> RunStore | None:
+    """
+    :return: the store results are recorded to, given --store and --no_store
+    """
+    return None if args.no_store else RunStore(args.store)
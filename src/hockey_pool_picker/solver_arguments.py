@@ -0,0 +1,37 @@
+def add_solver_parameters_arguments(parser):
+    parser.add_argument(
+        "--solver_workers",
+        type=int,
+        default=None,
+        help="CP-SAT only. Number of parallel search workers per solve.",
+    )
+    parser.add_argument(
+        "--time_limit",
+        type=float,
+        default=None,
+        help="CP-SAT only. Time limit in seconds per solve. The best solution found "
+        "is used even if it isn't proven optimal.",
+    )
+    parser.add_argument(
+        "--relative_gap",
+        type=float,
+        default=None,
+        help="CP-SAT only. Stop solving once a solution is within this relative gap "
+        "of optimal, e.g. 0.01 for 1%%.",
+    )
+
+
+def solver_parameters(args):
+    parameters = {
+        "num_workers": args.solver_workers,
+        "max_time": args.time_limit,
+        "relative_gap": args.relative_gap,
+    }
+    return {name: value for name, value in parameters.items() if value is not None}
+
+
+def check_solver_parameters(parser, args):
+    if args.solver != "cpsat" and solver_parameters(args):
+        parser.error(
+            "--solver_workers, --time_limit and --relative_gap require --solver cpsat"
+        )
@@ -1,63 +1,125 @@
+import numpy as np
 import pandas as pd
 
+from hockey_pool_picker import profiling
 from hockey_pool_picker.util import (
     inner_merge_dropping_duplicates,
     PLAYER_TYPES,
 )
 from hockey_pool_picker.core.season import Season
-from hockey_pool_picker.sources.puckpedia import PuckpediaStatsAndCapHitSource
 
 
 class BacktestingSource:
     def __init__(self, past_season: Season, source):
         self.past_season = past_season
         self.source = source
+        # column identifying a player across seasons
+        self.key = "player_id"
+        # per player type, a series of present season row positions indexed by key,
+        # built by load_players
+        self.present_index = None
+
+    def load(
+        self, picking_strategy, evaluation_strategy
+    ) -> (list[pd.DataFrame], list[pd.DataFrame]):
+        return self.apply_strategies(
+            *self.load_players(), picking_strategy, evaluation_strategy
+        )
+
+    def load_players(self) -> (list[pd.DataFrame], list[pd.DataFrame]):
+        """
+        Loads players present in both seasons, without values, so that the same
+        players can be evaluated under different strategies.
+        """
+        past_source = self.source(self.past_season)
+        present_source = self.source(self.past_season.next())
 
-    def load(self, picking_strategy, evaluation_strategy) -> (list[pd.DataFrame], list[pd.DataFrame]):
         past_pool = []
         present_pool = []
-        for player_type in PLAYER_TYPES:
-            past_season_df = self.source(self.past_season).load(player_type)
-            present_season_df = self.source(self.past_season.next()).load(player_type)
-
-            # as the puckpedia source provides both stats and cap hits, we don't need to join separate sources
-            if self.source == PuckpediaStatsAndCapHitSource:
-                (past_players, present_players) = self._keep_intersection(
-                    past_season_df, present_season_df, "p_id"
-                )
-            else:
-                (past_players, present_players) = self._keep_intersection(
-                    past_season_df, present_season_df
-                )
-                for a, b in zip(
-                    past_players["normalized_name"].to_list(),
-                    present_players["normalized_name"].to_list(),
-                ):
-                    assert (
-                        a == b
-                    ), f"Names of type {player_type} do not match {a} != {b}"
-
-                if not past_players["normalized_name"].equals(
-                    present_players["normalized_name"]
-                ):
-                    raise Exception(f"{player_type} do not match!")
+        with profiling.span("load_players"):
+            for player_type in PLAYER_TYPES:
+                with profiling.span("past_season"):
+                    past_season_df = past_source.load(player_type)
+                with profiling.span("present_season"):
+                    present_season_df = present_source.load(player_type)
 
-            past_players["value"] = picking_strategy.apply(past_players, player_type)
-            # to ensure we have a pool valid for next year, we use players' next year
-            # cap hit as weight.
-            past_players["weight"] = present_players["cap_hit"]
+                with profiling.span("intersect"):
+                    (past_players, present_players) = self._keep_intersection(
+                        past_season_df, present_season_df, self.key
+                    )
+                if not past_players[self.key].equals(present_players[self.key]):
+                    raise Exception(f"{player_type} do not match!")
+                profiling.count(
+                    "players_loaded", len(past_season_df) + len(present_season_df)
+                )
+                profiling.count("players_kept", len(past_players))
 
-            present_players["value"] = evaluation_strategy.apply(
-                present_players, player_type
-            )
-            present_players["weight"] = present_players["cap_hit"]
+                past_pool.append(past_players)
+                present_pool.append(present_players)
 
-            past_pool.append(past_players)
-            present_pool.append(present_players)
+            self.present_index = [self.build_index(players) for players in present_pool]
 
         return past_pool, present_pool
 
-    def _keep_intersection(self, past, present, column="normalized_name"):
+    def build_index(self, players) -> pd.Series:
+        """
+        :return: the positions of players indexed by key, to find players in constant
+        time
+        """
+        index = pd.Series(np.arange(len(players)), index=players[self.key].to_numpy())
+        return index[~index.index.duplicated(keep="first")]
+
+    @staticmethod
+    def apply_strategies(
+        past_pool, present_pool, picking_strategy, evaluation_strategy
+    ) -> (list[pd.DataFrame], list[pd.DataFrame]):
+        with profiling.span("apply_strategies"):
+            past_values = [
+                picking_strategy.apply(players, player_type)
+                for player_type, players in zip(PLAYER_TYPES, past_pool)
+            ]
+            present_values = [
+                evaluation_strategy.apply(players, player_type)
+                for player_type, players in zip(PLAYER_TYPES, present_pool)
+            ]
+
+        return BacktestingSource.apply_values(
+            past_pool, present_pool, past_values, present_values
+        )
+
+    @staticmethod
+    def apply_values(
+        past_pool, present_pool, past_values, present_values
+    ) -> (list[pd.DataFrame], list[pd.DataFrame]):
+        """
+        Sets values computed beforehand, e.g. every strategy's values computed at once
+        with evaluate_strategies.
+        :param past_values: per player type, the value of every past player
+        :param present_values: per player type, the value of every present player
+        """
+        valued_past_pool = []
+        valued_present_pool = []
+        with profiling.span("apply_values"):
+            for past_players, present_players, past_value, present_value in zip(
+                past_pool, present_pool, past_values, present_values
+            ):
+                past_players = past_players.copy()
+                present_players = present_players.copy()
+
+                past_players["value"] = np.asarray(past_value)
+                # to ensure we have a pool valid for next year, we use players' next
+                # year cap hit as weight.
+                past_players["weight"] = present_players["cap_hit"]
+
+                present_players["value"] = np.asarray(present_value)
+                present_players["weight"] = present_players["cap_hit"]
+
+                valued_past_pool.append(past_players)
+                valued_present_pool.append(present_players)
+
+        return valued_past_pool, valued_present_pool
+
+    def _keep_intersection(self, past, present, column="player_id"):
         # TODO(nico): List who we're dropping
         intersection = inner_merge_dropping_duplicates(past, present, column)
 
@@ -1,9 +1,8 @@
 import re
 
-from bs4 import BeautifulSoup
-
-from hockey_pool_picker.sources import ndjson
+from hockey_pool_picker.sources import ndjson, season_cache
 from hockey_pool_picker.sources.crawl_cache import session
+from hockey_pool_picker.sources.parsing import PARSER
 from hockey_pool_picker.core.season import Season
 
 player_type_map = {
@@ -20,7 +19,10 @@ class MarqueurCapHitSource:
         self.season = season
 
     def load(self, player_type):
-        players = ndjson.read_to_df(f"marqueur/{self.season}.ndjson")
+        file_name = f"marqueur/{self.season}.ndjson"
+        players = season_cache.load(
+            self.season, file_name, lambda: ndjson.read_to_df(file_name)
+        )
 
         df = players[players["type"] == player_type]
         assert (
@@ -32,9 +34,11 @@ class MarqueurCapHitSource:
         # 165 is the 2023-2024 season
         adjustment = 2023 - 165
         url = f"https://www.marqueur.com/hockey/stats/nhl/salaries.php?a={self.season.start - adjustment}&e=0&p=0&o=0"
-        response = session.request("GET", url)
+        response = session().request("GET", url)
+
+        from bs4 import BeautifulSoup
 
-        soup = BeautifulSoup(response.content, "html.parser")
+        soup = BeautifulSoup(response.content, PARSER)
         table = soup.select_one(
             "body > div.w3-main > div.pl15.pr15.pb20 > div > div.p20 > table"
         )
@@ -1,9 +1,32 @@
+from functools import cache
 from pathlib import Path
 
-import requests_cache
+from hockey_pool_picker.sources.data_dir import data_dir
 
 base_dir = Path(__file__).parent.parent.parent.parent
 
-print(base_dir)
 
-session = requests_cache.CachedSession(base_dir / "data" / "cache" / "requests")
+@cache
+def session():
+    """
+    :return: the session caching every crawled page, created on first use since
+    opening the cache is only needed when crawling
+    """
+    import requests_cache
+
+    return requests_cache.CachedSession(data_dir(base_dir) / "cache" / "requests")
+
+
+class NotCachedError(Exception):
+    pass
+
+
+def cached_content(url, cached_session=None):
+    """
+    :return: the body of a page from the cache, without ever requesting it
+    """
+    response = (cached_session or session()).get(url, only_if_cached=True)
+    # requests-cache answers with a 504 when the page isn't cached
+    if response.status_code == 504:
+        raise NotCachedError(f"{url} isn't cached, crawl it first")
+    return response.content
@@ -0,0 +1,13 @@
+import os
+from pathlib import Path
+
+# points every source to another data folder, e.g. a generated league to benchmark
+ENVIRONMENT_VARIABLE = "HOCKEY_POOL_PICKER_DATA_DIR"
+
+
+def data_dir(base_dir: Path) -> Path:
+    """
+    :param base_dir: folder holding the default data folder
+    :return: the folder data is read from and written to
+    """
+    return Path(os.environ.get(ENVIRONMENT_VARIABLE, base_dir / "data"))
@@ -1,14 +1,20 @@
+import asyncio
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from time import sleep
-import pandas as pd
 
-from bs4 import BeautifulSoup
-
-from hockey_pool_picker.sources import ndjson
-from hockey_pool_picker.sources.crawl_cache import session
+from hockey_pool_picker.sources import crawl_cache, ndjson, season_cache
+from hockey_pool_picker.sources.parsing import Page
+from hockey_pool_picker.sources.rate_limit import TokenBucket
 from hockey_pool_picker.core.season import Season
 
+BASE_URL = "https://www.hockey-reference.com"
 CRAWL_DELAY = timedelta(seconds=3)
+# number of cached pages parsed at a time when rebuilding from the cache
+REBUILD_BATCH_SIZE = 256
+BOX_SCORE_LINK = re.compile(r"/boxscores/(\d{8})\w+\.html$")
 
 player_positions = {
     "forward": ["C", "LW", "RW", "F", "W"],
@@ -17,71 +23,284 @@ player_positions = {
 }
 
 
+def player_code(link):
+    """
+    :return: the player code from a link to the player's page, e.g. mcdavco01 for
+    /players/m/mcdavco01.html
+    """
+    return link["href"].rsplit("/", 1)[-1].removesuffix(".html")
+
+
+def game_day(link):
+    """
+    :return: the day a game was played on from its box score link, e.g. 2022-10-07 for
+    /boxscores/202210070TOR.html
+    """
+    day = BOX_SCORE_LINK.search(link).group(1)
+    return f"{day[:4]}-{day[4:6]}-{day[6:]}"
+
+
 class HockeyReferenceGamesSource:
-    def __init__(self, season: Season):
+    def __init__(self, season: Season, session=None, base_url=BASE_URL):
+        """
+        :param session: session used to crawl, defaults to the cached session
+        :param base_url: URL of hockey-reference, e.g. a local server when testing
+        """
         self.season = season
+        self.session = session
+        self.base_url = base_url
 
     def load(self):
-        games = ndjson.read_to_df(self.file_name())
-        games["date"] = pd.to_datetime(games["date"])
-
-        return games
+        return season_cache.load(
+            self.season,
+            self.file_name(),
+            lambda: ndjson.read_to_df(self.file_name(), dates=["date"]),
+        )
 
     def file_name(self):
         return f"hockey_reference/games_{self.season}.ndjson"
 
-    def crawl(self):
-        prefix = "https://www.hockey-reference.com"
-        response = session.get(f"{prefix}/leagues/NHL_{self.season.end}_games.html")
+    def checkpoint_file(self):
+        return ndjson.data_path(f"{self.file_name()}.partial")
 
-        soup = BeautifulSoup(response.content, "html.parser")
+    def crawl(self, incremental=False):
+        """
+        :param incremental: only crawl games missing from the games file, and append
+        them to it, instead of crawling the whole season again
+        """
+        game_links = self._links_to_crawl(incremental)
 
         games = []
-        game_rows = soup.find(id="games").find("tbody").find_all("tr")
-        for i, game_row in enumerate(game_rows):
-            link = game_row.find("th").find("a")
-            full_link = f"{prefix}{link['href']}"
-
-            percent_progress = round((i + 1) / len(game_rows) * 100, 2)
-            print(
-                f"\r({percent_progress:.2f}%) {i + 1}/{len(game_rows)}: {full_link}",
-                end="",
-            )
+        for i, full_link in enumerate(game_links):
+            self._print_progress(i + 1, len(game_links), full_link)
 
             date, scores, goalies, from_cache = self._crawl_game(full_link)
 
-            games.append({"date": date, "scores": scores, "goalies": goalies})
+            games.append(
+                {"date": date, "scores": scores, "goalies": goalies, "url": full_link}
+            )
 
             if not from_cache:
                 sleep(CRAWL_DELAY.seconds)
 
+        self._write(games, incremental)
+
+    def crawl_concurrently(self, concurrency=4, delay=CRAWL_DELAY, incremental=False):
+        """
+        Crawls games with up to concurrency requests in flight, parsing pages while
+        others are downloaded. Uncached requests are spread out to one per delay on
+        average across all requests.
+
+        Crawled games are checkpointed as they come in, so an interrupted crawl
+        resumes where it stopped.
+        """
+        asyncio.run(self._crawl_concurrently(concurrency, delay, incremental))
+
+    async def _crawl_concurrently(self, concurrency, delay, incremental):
+        game_links = await asyncio.to_thread(self._links_to_crawl, incremental)
+
+        games = self._read_checkpoint()
+        rate_limiter = TokenBucket(rate=1 / delay.total_seconds())
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def crawl_game(link):
+            async with semaphore:
+                if not self._is_cached(link):
+                    await rate_limiter.acquire()
+                response = await asyncio.to_thread(self._get_game, link)
+
+            # parsing runs in a thread so that other downloads keep progressing
+            date, scores, goalies = await asyncio.to_thread(
+                self._parse_game, response.content
+            )
+            return {"date": date, "scores": scores, "goalies": goalies, "url": link}
+
+        checkpoint_file = self.checkpoint_file()
+        checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+        checkpoint = await asyncio.to_thread(open, checkpoint_file, "a")
+        tasks = [
+            asyncio.create_task(crawl_game(link))
+            for link in game_links
+            if link not in games
+        ]
+        try:
+            # games are checkpointed here only, one at a time as they come in
+            for crawled in asyncio.as_completed(tasks):
+                game = await crawled
+                games[game["url"]] = game
+                await asyncio.to_thread(self._checkpoint, checkpoint, game)
+                self._print_progress(len(games), len(game_links), game["url"])
+        finally:
+            # when a game fails, the others are stopped before the checkpoint closes
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            checkpoint.close()
+
+        self._write([games[link] for link in game_links], incremental)
+        checkpoint_file.unlink()
+
+    @staticmethod
+    def _checkpoint(checkpoint, game):
+        checkpoint.write(json.dumps(game, ensure_ascii=False, default=str) + "\n")
+        checkpoint.flush()
+
+    def _links_to_crawl(self, incremental):
+        game_links = self._crawl_game_links()
+        if not incremental:
+            return game_links
+
+        captured = self._read_games()
+        urls = {game.get("url") for game in captured}
+        # games crawled before urls were stored are matched on their day, every game
+        # up to the last day captured being considered captured
+        legacy_days = [game["date"][:10] for game in captured if not game.get("url")]
+        last_legacy_day = max(legacy_days, default="")
+
+        return [
+            link
+            for link in game_links
+            if link not in urls and game_day(link) > last_legacy_day
+        ]
+
+    def _write(self, games, incremental):
+        if incremental:
+            ndjson.append(self.file_name(), games)
+        else:
+            ndjson.write(self.file_name(), games)
+
+    def _read_games(self):
+        """
+        :return: the raw games of the games file, without parsing them
+        """
+        return self._read_records(ndjson.data_path(self.file_name()))
+
+    def _read_checkpoint(self):
+        """
+        :return: games crawled by an interrupted crawl, keyed by link
+        """
+        return {
+            game["url"]: game for game in self._read_records(self.checkpoint_file())
+        }
+
+    @staticmethod
+    def _read_records(file):
+        if not file.exists():
+            return []
+        with open(file) as lines:
+            return [json.loads(line) for line in lines]
+
+    def _session(self):
+        return self.session if self.session is not None else crawl_cache.session()
+
+    def _is_cached(self, link):
+        cache = getattr(self._session(), "cache", None)
+        return cache is not None and cache.contains(url=link)
+
+    @staticmethod
+    def _print_progress(done, total, link):
+        percent_progress = round(done / total * 100, 2)
+        print(f"\r({percent_progress:.2f}%) {done}/{total}: {link}", end="")
+
+    def rebuild_from_cache(self, workers=None):
+        """
+        Writes the games file again from the pages in the request cache, without any
+        request, e.g. after fixing the parser. Pages are parsed across a pool of
+        processes, in batches to bound the number of pages held in memory.
+        :raise NotCachedError: when a page isn't cached
+        """
+        schedule = crawl_cache.cached_content(self._schedule_url(), self._session())
+        game_links = self._game_links(schedule)
+
+        games = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for start in range(0, len(game_links), REBUILD_BATCH_SIZE):
+                links = game_links[start : start + REBUILD_BATCH_SIZE]
+                contents = [
+                    crawl_cache.cached_content(link, self._session()) for link in links
+                ]
+
+                parsed = executor.map(self._parse_game, contents, chunksize=8)
+                for link, (date, scores, goalies) in zip(links, parsed):
+                    games.append(
+                        {
+                            "date": date,
+                            "scores": scores,
+                            "goalies": goalies,
+                            "url": link,
+                        }
+                    )
+                self._print_progress(len(games), len(game_links), links[-1])
+
         ndjson.write(self.file_name(), games)
 
+    def _schedule_url(self):
+        return f"{self.base_url}/leagues/NHL_{self.season.end}_games.html"
+
+    def _crawl_game_links(self):
+        response = self._session().get(self._schedule_url())
+
+        return self._game_links(response.content)
+
+    def _game_links(self, schedule):
+        games_table = Page(schedule).find("table", id="games")
+
+        game_links = []
+        for game_row in games_table.find("tbody").find_all("tr"):
+            link = game_row.find("th").find("a")
+            # games that weren't played yet don't link to a box score
+            if link is None or not BOX_SCORE_LINK.match(link["href"]):
+                continue
+            game_links.append(f"{self.base_url}{link['href']}")
+
+        return game_links
+
     def _crawl_game(self, link):
-        response = session.get(link)
+        response = self._get_game(link)
+
+        date, scores, goalies = self._parse_game(response.content)
+
+        return date, scores, goalies, getattr(response, "from_cache", False)
+
+    def _get_game(self, link):
+        response = self._session().get(link)
 
         if response.status_code != 200:
             raise Exception(f"Failed to crawl game {link}", response)
 
-        soup = BeautifulSoup(response.content, "html.parser")
+        return response
+
+    @staticmethod
+    def _parse_game(content, page_class=Page):
+        """
+        :param page_class: how elements are found in the page, see parsing
+        """
+        page = page_class(content)
 
-        date_str = soup.find(class_="scorebox_meta").find("div").text.strip()
+        date_str = page.find("div", class_="scorebox_meta").find("div").text.strip()
         date = datetime.strptime(date_str, "%B %d, %Y, %I:%M %p")
 
-        scoring_rows = soup.find(id="scoring").find_all("tr")
+        scoring_rows = page.find("table", id="scoring").find_all("tr")
 
         scores = []
         for row in scoring_rows:
             cols = row.find_all("td")
             if len(cols) == 5:
-                scorer = cols[3].find("a").text.strip()
-                assists = [a.text.strip() for a in cols[4].find_all("a")]
-                scores.append({"scorer": scorer, "assists": assists})
+                scorer = cols[3].find("a")
+                assists = cols[4].find_all("a")
+                scores.append(
+                    {
+                        "scorer": scorer.text.strip(),
+                        "assists": [a.text.strip() for a in assists],
+                        "scorer_code": player_code(scorer),
+                        "assist_codes": [player_code(a) for a in assists],
+                    }
+                )
 
         goalies = []
 
         breadcrumb = (
-            soup.find(id="footer_header")
+            page.find("div", id="footer_header")
             .find(class_="breadcrumbs")
             .find_all("a")[2]
             .text.split(",")[0]
@@ -89,7 +308,9 @@ class HockeyReferenceGamesSource:
         codes = [place.strip() for place in breadcrumb.split("at")]
 
         for code in codes:
-            goalie_rows = soup.find(id=f"{code}_goalies").find("tbody").find_all("tr")
+            goalie_rows = (
+                page.find("table", id=f"{code}_goalies").find("tbody").find_all("tr")
+            )
             for row in goalie_rows:
                 cols = row.find_all("td")
                 maybe_name = cols[0].find("a")
@@ -111,6 +332,7 @@ class HockeyReferenceGamesSource:
                     {
                         "decision": decision,
                         "name": name,
+                        "player_code": player_code(maybe_name),
                         "shutout": int(shutout) == 1,
                         "saves": int(saves),
                         "saves_percent": float(saves_percent)
@@ -119,4 +341,4 @@ class HockeyReferenceGamesSource:
                     }
                 )
 
-        return date, scores, goalies, response.from_cache
+        return date, scores, goalies
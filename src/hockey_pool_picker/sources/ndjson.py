@@ -1,23 +1,94 @@
 import json
+import logging
+import pickle
 from pathlib import Path
 
 import pandas as pd
 
+from hockey_pool_picker.sources.data_dir import data_dir
 
-def read_to_df(path: str) -> pd.DataFrame:
-    base_dir = Path(__file__).parent.parent.parent.parent
-    file = base_dir / "data" / Path(path)
+base_dir = Path(__file__).parent.parent.parent.parent
+
+# bump when the way files are parsed changes, to invalidate existing caches
+CACHE_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+def data_path(path: str) -> Path:
+    """
+    :param path: path of a file within the data folder
+    :return: where the file is read from and written to, whatever the current directory
+    """
+    return data_dir(base_dir) / Path(path)
+
+
+def read_to_df(path: str, dates: list[str] | None = None) -> pd.DataFrame:
+    """
+    Reads a JSON-lines file from the data folder, serving it from a binary cache stored
+    next to it when the cache is fresher than the file.
+    :param dates: columns to parse as datetimes before caching
+    """
+    file = data_path(path)
     # check if file exists
     if not file.exists():
         raise FileNotFoundError(f"File {file} not found")
-    return pd.read_json(file, lines=True)
 
+    cache_file = file.with_name(f"{file.name}.cache")
+    key = {
+        "source": str(file),
+        "mtime_ns": file.stat().st_mtime_ns,
+        "version": CACHE_VERSION,
+        "dates": dates,
+    }
+
+    df = _read_cache(cache_file, key)
+    if df is None:
+        df = pd.read_json(file, lines=True)
+        for column in dates or []:
+            df[column] = pd.to_datetime(df[column])
+        _write_cache(cache_file, key, df)
+
+    return df
 
-def write(path: str, records: list[dict]):
-    with open("data" / Path(path), "w") as file:
+
+def _read_cache(cache_file: Path, key: dict):
+    if not cache_file.exists():
+        return None
+
+    try:
+        with open(cache_file, "rb") as file:
+            # the key is stored first so stale caches are detected without reading
+            # the whole dataframe
+            if pickle.load(file) != key:
+                return None
+            return pickle.load(file)
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as error:
+        # e.g. a truncated cache, or a cache of older pandas or classes, which is
+        # rebuilt from the file
+        logger.warning("Ignoring unreadable cache %s: %r", cache_file, error)
+        return None
+
+
+def _write_cache(cache_file: Path, key: dict, df: pd.DataFrame):
+    try:
+        with open(cache_file, "wb") as file:
+            pickle.dump(key, file, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(df, file, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        # caching is best-effort, e.g. on a read-only data folder
+        cache_file.unlink(missing_ok=True)
+
+
+def write(path: str, records: list[dict], mode="w"):
+    with open(data_path(path), mode) as file:
         for row in records:
             # default=str to handle dates
             file.write(
                 json.dumps(row, separators=(",", ":"), ensure_ascii=False, default=str)
                 + "\n"
             )
+
+
+def append(path: str, records: list[dict]):
+    write(path, records, mode="a")
@@ -0,0 +1,68 @@
+import re
+from importlib.util import find_spec
+
+# BeautifulSoup is only imported when parsing, since loading crawled data doesn't
+# need it
+PARSER = "lxml" if find_spec("lxml") is not None else "html.parser"
+
+
+class Page:
+    """
+    Finds elements of a page by id or class without parsing the whole document: the
+    element's markup is cut out of the raw page, and only that is parsed, with lxml
+    when it is installed.
+
+    Since the raw markup is searched, elements inside HTML comments are found too, like
+    the tables hockey-reference only renders with JavaScript.
+    """
+
+    def __init__(self, content):
+        self.text = content.decode("utf-8") if isinstance(content, bytes) else content
+
+    def find(self, tag, id=None, class_=None):
+        """
+        :return: the first tag element with the id or class, or None
+        """
+        if id is not None:
+            attribute = rf'\bid="{re.escape(id)}"'
+        else:
+            attribute = rf'\bclass="(?:[^"]*\s)?{re.escape(class_)}(?:\s[^"]*)?"'
+
+        start = re.search(rf"<{tag}\b[^>]*{attribute}[^>]*>", self.text)
+        if start is None:
+            return None
+
+        from bs4 import BeautifulSoup
+
+        end = _closing_tag_end(self.text, tag, start.end())
+        return BeautifulSoup(self.text[start.start() : end], PARSER).find(tag)
+
+
+class DocumentPage:
+    """
+    Finds elements of a page by parsing the whole document, e.g. to compare with Page.
+    """
+
+    def __init__(self, content, parser="html.parser"):
+        from bs4 import BeautifulSoup
+
+        self.soup = BeautifulSoup(content, parser)
+
+    def find(self, tag, id=None, class_=None):
+        if id is not None:
+            return self.soup.find(tag, id=id)
+        return self.soup.find(tag, class_=class_)
+
+
+def _closing_tag_end(text, tag, position):
+    """
+    :return: the position after the tag closing the one opened before position,
+    accounting for nested tags of the same name
+    """
+    depth = 1
+    for match in re.compile(rf"<(/?){tag}\b[^>]*>").finditer(text, position):
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            return match.end()
+
+    return len(text)
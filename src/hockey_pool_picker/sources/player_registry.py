@@ -0,0 +1,169 @@
+import json
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from hockey_pool_picker.sources.data_dir import data_dir
+from hockey_pool_picker.util import normalize_names
+
+base_dir = Path(__file__).parent.parent.parent.parent
+
+SOURCES = ["hockey_reference", "puckpedia", "marqueur"]
+
+
+class PlayerRegistry:
+    """
+    Maps every source's own identifier for a player, i.e. hockey-reference's player
+    code, puckpedia's p_id and marqueur's name, to one integer id that stays the same
+    across sources and seasons.
+
+    A key seen for the first time is linked to an existing player with the same
+    normalized name that has no key from that source yet. Players sharing a name are
+    told apart by their type, e.g. Sebastian Aho the forward and Sebastian Aho the
+    defender, then by the season they're seen in. When no such player exists, or when
+    more than one is left, e.g. two Matt Murrays both playing their first season, a
+    new id is created. The registry is a JSON-lines file, so wrong or missing links
+    can be fixed by hand.
+
+    New players are only written to the file by save, once players.register_players
+    registered every source's players of a season in the same order, so that ids
+    don't depend on the order sources happen to be loaded in.
+    """
+
+    def __init__(self, path="players/registry.ndjson"):
+        self.file = data_dir(base_dir) / Path(path)
+        # (source, key) -> id
+        self.ids_by_key = {}
+        # normalized name -> ids
+        self.ids_by_name = {}
+        # id -> sources with a key for that player
+        self.sources_by_id = {}
+        # id -> player type
+        self.types_by_id = {}
+        # id -> starting years of the seasons the player was seen in
+        self.seasons_by_id = {}
+        self.next_id = 1
+        # entries registered since the last save
+        self.unsaved = []
+        # starting years of the seasons whose players were all registered, see
+        # players.register_players
+        self.registered_seasons = set()
+
+        if self.file.exists():
+            with open(self.file) as file:
+                for line in file:
+                    self._add(**json.loads(line))
+
+    def ids(
+        self, source: str, keys, names=None, player_type=None, season=None
+    ) -> np.ndarray:
+        """
+        :param keys: the source's identifiers of the players
+        :param names: display names of the players, used to link keys seen for the
+        first time to existing players. Defaults to the keys.
+        :param player_type: type of the players, e.g. forward, used to tell apart
+        players with the same name
+        :param season: season the players are seen in, used to tell apart players with
+        the same name and type
+        :return: the id of every player, registering new ones
+        """
+        assert source in SOURCES, f"Unknown player source {source}"
+
+        season = None if season is None else season.start
+        keys = pd.Series(keys, dtype=object).astype(str).to_numpy()
+        names = keys if names is None else np.asarray(names, dtype=object)
+
+        ids = np.array(
+            [self.ids_by_key.get((source, key), 0) for key in keys], dtype=np.int64
+        )
+        # known players are seen in the season before new ones are linked to them
+        if season is not None:
+            for player_id in ids[ids != 0].tolist():
+                self.seasons_by_id.setdefault(player_id, set()).add(season)
+
+        unknown = np.flatnonzero(ids == 0)
+        normalized_names = normalize_names(names[unknown]).to_numpy()
+
+        for i, name in zip(unknown, normalized_names):
+            key = keys[i]
+            if (source, key) not in self.ids_by_key:
+                entry = {
+                    "id": self._link(source, name, names[i], player_type, season),
+                    "source": source,
+                    "key": key,
+                    "name": name,
+                    "type": player_type,
+                    "season": season,
+                }
+                self._add(**entry)
+                self.unsaved.append(entry)
+            ids[i] = self.ids_by_key[(source, key)]
+
+        return ids
+
+    def _link(self, source, name, display_name, player_type, season):
+        candidates = [
+            player_id
+            for player_id in self.ids_by_name.get(name, [])
+            if source not in self.sources_by_id[player_id]
+        ]
+        # players sharing a name are told apart by their type, then by the season
+        for matches in [
+            lambda player_id: self.types_by_id.get(player_id) == player_type,
+            lambda player_id: season in self.seasons_by_id.get(player_id, ()),
+        ]:
+            if len(candidates) > 1:
+                candidates = [
+                    player_id for player_id in candidates if matches(player_id)
+                ] or candidates
+
+        if len(candidates) == 1:
+            return candidates[0]
+
+        if len(candidates) > 1:
+            warnings.warn(
+                f"{display_name} from {source} matches players {candidates}, "
+                f"registering as a new player",
+                stacklevel=3,
+            )
+        return self.next_id
+
+    def _add(self, id, source, key, name, type=None, season=None):
+        self.ids_by_key[(source, key)] = id
+        if id not in self.ids_by_name.get(name, []):
+            self.ids_by_name.setdefault(name, []).append(id)
+        self.sources_by_id.setdefault(id, set()).add(source)
+        if type is not None:
+            self.types_by_id[id] = type
+        if season is not None:
+            self.seasons_by_id.setdefault(id, set()).add(season)
+        self.next_id = max(self.next_id, id + 1)
+
+    def save(self):
+        """
+        Appends the players registered since the last save to the registry's file.
+        """
+        if not self.unsaved:
+            return
+
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.file, "a") as file:
+            file.writelines(
+                json.dumps(entry, ensure_ascii=False) + "\n" for entry in self.unsaved
+            )
+        self.unsaved = []
+
+
+_registry = None
+
+
+def registry() -> PlayerRegistry:
+    """
+    :return: the registry shared by every source, loaded on first use
+    """
+    global _registry
+    if _registry is None:
+        _registry = PlayerRegistry()
+    return _registry
@@ -1,41 +1,68 @@
 import pandas as pd
 
-from hockey_pool_picker.util import normalize_name, RETIRED_PLAYERS
+from hockey_pool_picker import profiling
+from hockey_pool_picker.util import PLAYER_TYPES, RETIRED_PLAYERS
 from hockey_pool_picker.core.season import Season
+from hockey_pool_picker.sources.player_registry import registry
 from hockey_pool_picker.sources.stats.hockey_reference import (
     HockeyReferencePlayersSource,
 )
 from hockey_pool_picker.sources.puckpedia import PuckpediaStatsAndCapHitSource
 
 
+def register_players(season: Season):
+    """
+    Registers the season's players of every source, linking them by name, and saves
+    the registry so that they keep their ids in later runs. Players are registered in
+    the same order every time, so their ids don't depend on the order sources are
+    loaded in.
+    """
+    for player_type in PLAYER_TYPES:
+        HockeyReferencePlayersSource(season).load(player_type)
+    # puckpedia's players are downloaded by hand, so they may not be there yet
+    try:
+        for player_type in PLAYER_TYPES:
+            PuckpediaStatsAndCapHitSource(season).load(player_type)
+    except FileNotFoundError:
+        print(f"No puckpedia players in season {season}, registering them later")
+    else:
+        registry().registered_seasons.add(season.start)
+
+    registry().save()
+
+
 class PlayersSource:
     def __init__(self, season: Season):
         self.season = season
         self.players_source = HockeyReferencePlayersSource(season)
         self.players_with_cap_hit_source = PuckpediaStatsAndCapHitSource(season)
 
-    # load players from both sources
-    # add the normalized_name column to both dataframes
+    # load players from both sources, joined on their player id
     def load(self, player_type):
-        stats = self.players_source.load(player_type)
+        if self.season.start not in registry().registered_seasons:
+            with profiling.span("register"):
+                register_players(self.season)
+
+        with profiling.span("stats"):
+            stats = self.players_source.load(player_type)
         # keep ones that have played games
         stats = stats[stats["games_played"] > 1]
-        cap_hits = self.players_with_cap_hit_source.load(player_type)
+        with profiling.span("cap_hits"):
+            cap_hits = self.players_with_cap_hit_source.load(player_type)
         cap_hits = cap_hits[cap_hits["st_gp"].astype(int) > 1]
 
-        stats["normalized_name"] = stats["name"].map(normalize_name)
-        cap_hits["normalized_name"] = cap_hits["name"].map(normalize_name)
-
-        self._pick_out_anomalies(stats, cap_hits)
+        with profiling.span("anomalies"):
+            self._pick_out_anomalies(stats, cap_hits)
 
-        return self.join_to_cap_hit(stats, cap_hits)
+        with profiling.span("join"):
+            return self.join_to_cap_hit(stats, cap_hits)
 
     def _pick_out_anomalies(self, players, players_with_cap_hit):
         df = pd.merge(
             players,
             players_with_cap_hit,
             how="outer",
-            on=["normalized_name"],
+            on=["player_id"],
             suffixes=("_from_players_stats_source", "_from_cap_hit_source"),
         )
         is_na_or_retired = (
@@ -60,7 +87,7 @@ class PlayersSource:
             players,
             players_with_cap_hit,
             how="inner",
-            on=["normalized_name"],
+            on=["player_id"],
             suffixes=("", "_y"),
         )
         return df.drop(df.filter(regex="_y$").columns, axis=1)
@@ -1,10 +1,25 @@
+import itertools
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pandas as pd
-from pandas import json_normalize
 
+from hockey_pool_picker import profiling
 from hockey_pool_picker.core.season import Season
+from hockey_pool_picker.sources import season_cache
+from hockey_pool_picker.sources.data_dir import data_dir
+from hockey_pool_picker.sources.player_registry import registry
+
+try:
+    import orjson as json_parser
+except ImportError:
+    json_parser = json
+
+base_dir = Path(__file__).parent.parent.parent.parent
+
+# columns kept from the dumps, along with every st_* stat column
+COLUMNS = {"p_id", "p_fn", "p_ln", "p_url", "pos", "cap_hit"}
 
 player_type_map = {
     "forward": {"C", "R", "L"},
@@ -13,22 +28,46 @@ player_type_map = {
 }
 
 
+def _read_players(file):
+    with open(file, "rb") as data_file:
+        data = json_parser.loads(data_file.read())
+
+    # ['data']['p'] is sometimes a list of dicts, sometimes a dict of int -> dict
+    # we convert it to a list of dicts
+    players = data["data"]["p"]
+    if isinstance(players, dict):
+        players = players.values()
+
+    return [
+        {
+            column: value
+            for column, value in player.items()
+            if column in COLUMNS or column.startswith("st_")
+        }
+        for player in players
+    ]
+
+
 class PuckpediaStatsAndCapHitSource:
     def __init__(self, season: Season):
         self.season = season
 
     def load(self, player_type):
         folder = "goalies" if player_type == "goalie" else "skaters"
-        players = self.read_to_df(folder)
+        players = season_cache.load(
+            self.season, f"puckpedia/{folder}", lambda: self.read_to_df(folder)
+        )
 
         players = players[players["pos"].isin(player_type_map[player_type])]
         assert (
             not players.empty
         ), f"No players of type {player_type} found for season {self.season}"
         players["name"] = players["p_fn"] + " " + players["p_ln"]
-        players["cap_hit"] = (
-            players["cap_hit"].str.replace(r"\D", "", regex=True).astype(int)
-        )
+        with profiling.span("player_ids"):
+            players["player_id"] = registry().ids(
+                "puckpedia", players["p_id"], players["name"], player_type, self.season
+            )
+        players["cap_hit"] = players["cap_hit"].astype(int)
         # keep ones that have played games
         players = players[players["st_gp"].astype(int) >= 1]
         # for goalies, on puckpedia, the goals and assists per season are not present
@@ -45,10 +84,8 @@ class PuckpediaStatsAndCapHitSource:
         return players
 
     def read_to_df(self, folder: str) -> pd.DataFrame:
-        base_dir = Path(__file__).parent.parent.parent.parent
         dir_path = (
-            base_dir
-            / "data"
+            data_dir(base_dir)
             / "puckpedia"
             / "manual"
             / f"{self.season.start}-{self.season.end}"
@@ -59,19 +96,19 @@ class PuckpediaStatsAndCapHitSource:
                 f"Directory {dir_path} not found or is not a directory"
             )
 
-        all_files = dir_path.glob("*.json")
-        df_list = []
-        for file in all_files:
-            with open(file) as data_file:
-                data = json.load(data_file)
-                # ['data']['p'] is sometimes a list of dicts, sometimes a dict of int -> dict
-                # we convert it to a list of dicts
-                if isinstance(data["data"]["p"], dict):
-                    data["data"]["p"] = data["data"]["p"].values()
-                df = json_normalize(data["data"]["p"])
-                df_list.append(df)
-
-        return pd.concat(df_list, ignore_index=True)
+        # files are read and parsed concurrently, in a stable order
+        all_files = sorted(dir_path.glob("*.json"))
+        with ThreadPoolExecutor() as executor:
+            records = list(
+                itertools.chain.from_iterable(executor.map(_read_players, all_files))
+            )
+
+        df = pd.DataFrame.from_records(records)
+        df["cap_hit"] = pd.to_numeric(
+            df["cap_hit"].astype("string").str.replace(r"\D", "", regex=True),
+            errors="coerce",
+        ).astype("Int64")
+        return df
 
     def crawl(self):
         """
@@ -0,0 +1,36 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Rate limiter shared by concurrent tasks: tokens refill at a fixed rate, up to
+    capacity, and every acquisition takes one, waiting for it if none is left.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        """
+        :param rate: tokens added per second
+        :param capacity: maximum number of tokens, i.e. the largest burst allowed
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        # waiting tasks are served in order, so none of them starves
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
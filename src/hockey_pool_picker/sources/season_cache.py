@@ -0,0 +1,26 @@
+from hockey_pool_picker.core.season import Season
+
+# (season start, name) -> raw dataframe, as read from disk
+_frames = {}
+
+
+def load(season: Season, name: str, loader):
+    """
+    Serves a season's raw dataframe from memory, calling loader only the first time
+    it is requested in the process. Every player type slices the same frame, so
+    callers must filter or copy it instead of modifying it in place.
+    :param name: identifies the data within the season, e.g. its file name
+    """
+    key = (season.start, name)
+    if key not in _frames:
+        _frames[key] = loader()
+    return _frames[key]
+
+
+def invalidate(season: Season | None = None):
+    """
+    Forgets the frames of a season, or of every season, e.g. after crawling it again.
+    """
+    for key in list(_frames):
+        if season is None or key[0] == season.start:
+            del _frames[key]
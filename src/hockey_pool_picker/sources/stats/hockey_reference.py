@@ -1,10 +1,11 @@
-import json
+from concurrent.futures import ProcessPoolExecutor
 
-from bs4 import BeautifulSoup
-
-from hockey_pool_picker.sources import ndjson
+from hockey_pool_picker import profiling
+from hockey_pool_picker.sources import ndjson, season_cache
 from hockey_pool_picker.util import massage_players, merge_on_indices
-from hockey_pool_picker.sources.crawl_cache import session
+from hockey_pool_picker.sources.crawl_cache import cached_content, session
+from hockey_pool_picker.sources.parsing import Page
+from hockey_pool_picker.sources.player_registry import registry
 from hockey_pool_picker.core.season import Season
 
 whole_number_columns = {
@@ -92,94 +93,90 @@ player_positions = {
 }
 
 
-class HockeyReferencePlayersSource:
-    def __init__(self, season: Season):
-        self.season = season
-
-    def crawl(self):
-        # with this structure, it should be relatively trivial to now crawl other tables
-        data = self._crawl_basic_stats()
-        self._persist(data, "skaters", "basic")
-
-        data = self.crawl_advanced_stats()
-        self._persist(data, "skaters", "advanced")
-
-        data = self.crawl_misc_stats()
-        self._persist(data, "skaters", "misc")
-
-        data = self.crawl_basic_goalies_stats()
-        self._persist(data, "goalies", "all")
-
-    def _crawl_basic_stats(self):
-        rows = self._crawl_rows(
-            url=f"https://www.hockey-reference.com/leagues/NHL_{self.season.end}_skaters.html",
-            table_id="player_stats",
-        )
-        return self.structure_rows_to_dicts(rows)
-
-    def crawl_advanced_stats(self):
-        rows = self._crawl_rows(
-            url=f"https://www.hockey-reference.com/leagues/NHL_{self.season.end}_skaters-advanced.html",
-            table_id="stats_adv_rs",
-        )
-        return self.structure_rows_to_dicts(rows)
+def parse_stats_table(content, table_id):
+    # some of the tables are commented out until rendered by JavaScript, which Page
+    # finds too
+    table = Page(content).find("table", id=table_id)
 
-    def crawl_misc_stats(self):
-        rows = self._crawl_rows(
-            url=f"https://www.hockey-reference.com/leagues/NHL_{self.season.end}_skaters-misc.html",
-            table_id="stats_misc_plus",
-        )
-        return self.structure_rows_to_dicts(rows)
+    return structure_rows_to_dicts(table.find_all("tr"))
 
-    def crawl_basic_goalies_stats(self):
-        rows = self._crawl_rows(
-            url=f"https://www.hockey-reference.com/leagues/NHL_{self.season.end}_goalies.html",
-            table_id="stats",
-        )
-        return self.structure_rows_to_dicts(rows)
 
-    def _persist(self, data, player_type, stats_type):
-        with open(self.file_name(player_type, stats_type), "w") as file:
-            for row in data:
-                file.write(json.dumps(row, ensure_ascii=False) + "\n")
+def structure_rows_to_dicts(rows):
+    data = []
+    for row in rows:
+        cells = row.find_all("td")
 
-    def structure_rows_to_dicts(self, rows):
-        data = []
-        for row in rows:
-            cells = row.find_all("td")
+        if cells:
+            row_data = {}
 
-            if cells:
-                row_data = {}
+            for i, cell in enumerate(cells):
+                column_name = cell["data-stat"]
+                value = cell.text
+                if value == "League Average":
+                    # skip the special "League Average" column
+                    continue
 
-                for i, cell in enumerate(cells):
-                    column_name = cell["data-stat"]
-                    value = cell.text
-                    if value == "League Average":
-                        # skip the special "League Average" column
-                        continue
+                if i == 0:
+                    # hockey-reference creates unique player codes for each player. This helps with disambiguating
+                    # players with the same name.
+                    row_data["player_code"] = cell["data-append-csv"]
 
-                    if i == 0:
-                        # hockey-reference creates unique player codes for each player. This helps with disambiguating
-                        # players with the same name.
-                        row_data["player_code"] = cell["data-append-csv"]
+                if column_name in whole_number_columns:
+                    row_data[column_name] = int(value) if value != "" else 0
+                elif column_name in decimal_columns:
+                    row_data[column_name] = float(value) if value != "" else 0
+                else:
+                    row_data[column_name] = value
 
-                    if column_name in whole_number_columns:
-                        row_data[column_name] = int(value) if value != "" else 0
-                    elif column_name in decimal_columns:
-                        row_data[column_name] = float(value) if value != "" else 0
-                    else:
-                        row_data[column_name] = value
+            data.append(row_data)
+    return data
 
-                data.append(row_data)
-        return data
 
-    def _crawl_rows(self, url, table_id):
-        response = session.get(url)
-        soup = BeautifulSoup(response.content, "html.parser")
+class HockeyReferencePlayersSource:
+    def __init__(self, season: Season):
+        self.season = season
 
-        table = soup.find(id=table_id)
+    def crawl(self):
+        # with this structure, it should be relatively trivial to now crawl other tables
+        for (player_type, stats_type), (url, table_id) in self.stats_tables().items():
+            response = session().get(url)
+            data = parse_stats_table(response.content, table_id)
+            self._persist(data, player_type, stats_type)
+
+    def rebuild_from_cache(self, workers=None):
+        """
+        Writes the stats files again from the pages in the request cache, without any
+        request, parsing pages across a pool of processes.
+        :raise NotCachedError: when a page isn't cached
+        """
+        tables = self.stats_tables()
+        contents = [cached_content(url) for url, _ in tables.values()]
+        table_ids = [table_id for _, table_id in tables.values()]
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = list(executor.map(parse_stats_table, contents, table_ids))
+
+        for (player_type, stats_type), data in zip(tables, parsed):
+            self._persist(data, player_type, stats_type)
+
+    def stats_tables(self):
+        """
+        :return: the url and table id of every crawled table, keyed by player type and
+        stats type
+        """
+        prefix = f"https://www.hockey-reference.com/leagues/NHL_{self.season.end}"
+        return {
+            ("skaters", "basic"): (f"{prefix}_skaters.html", "player_stats"),
+            ("skaters", "advanced"): (
+                f"{prefix}_skaters-advanced.html",
+                "stats_adv_rs",
+            ),
+            ("skaters", "misc"): (f"{prefix}_skaters-misc.html", "stats_misc_plus"),
+            ("goalies", "all"): (f"{prefix}_goalies.html", "stats"),
+        }
 
-        return table.find_all("tr")
+    def _persist(self, data, player_type, stats_type):
+        ndjson.write(self.file_name(player_type, stats_type), data)
 
     def load(self, player_type):
         if player_type == "goalie":
@@ -203,10 +200,7 @@ class HockeyReferencePlayersSource:
                 actual_columns
             ), f"Missing goalie columns: {expected_columns.difference(actual_columns)}"
 
-            # We drop the second "Matt Murray" even though it's a different goalie to
-            # remove duplicates. Ideally, we'd have a better way of identifying players.
-            goalies_all = goalies_all.drop_duplicates(subset="name", keep="first")
-            return goalies_all
+            return self._with_ids(goalies_all, player_type)
 
         misc = self._load_to_df("skaters", "misc", columns={"pos": "position"})
         misc = misc[misc["position"].isin(player_positions[player_type])]
@@ -230,15 +224,31 @@ class HockeyReferencePlayersSource:
         advanced = self._load_to_df("skaters", "advanced", columns={"pos": "position"})
         advanced = advanced[advanced["position"].isin(player_positions[player_type])]
 
-        merged = merge_on_indices([basic, advanced, misc])
-
-        return massage_players(merged)
+        with profiling.span("merge"):
+            merged = merge_on_indices([basic, advanced, misc])
+
+        return self._with_ids(massage_players(merged), player_type)
+
+    def _with_ids(self, players, player_type):
+        # players with the same name, like the two Matt Murrays, are told apart by
+        # their player code
+        players = players.copy()
+        players["player_code"] = players.index
+        with profiling.span("player_ids"):
+            players["player_id"] = registry().ids(
+                "hockey_reference",
+                players.index,
+                players["name"],
+                player_type,
+                self.season,
+            )
+        return players
 
     def _load_to_df(self, player_type, stats_type, columns=None, dtype=None):
         if columns is None:
             columns = {}
         df = (
-            ndjson.read_to_df(self.file_name(player_type, stats_type))
+            self._read(self.file_name(player_type, stats_type))
             .rename(columns=columns)
             .astype(dtype if dtype is not None else {})
             # Per-player totals are in the first row. Following rows for same player are
@@ -248,5 +258,10 @@ class HockeyReferencePlayersSource:
         df.set_index("player_code", inplace=True, verify_integrity=True)
         return df
 
+    def _read(self, file_name):
+        return season_cache.load(
+            self.season, file_name, lambda: ndjson.read_to_df(file_name)
+        )
+
     def file_name(self, player_type, stats_type):
         return f"hockey_reference/{self.season}_{player_type}_{stats_type}.ndjson"
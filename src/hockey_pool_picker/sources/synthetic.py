@@ -0,0 +1,342 @@
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from hockey_pool_picker.core.season import Season
+from hockey_pool_picker.sources.games.hockey_reference import BASE_URL
+
+FIRST_NAMES = [
+    "Adam",
+    "Brady",
+    "Cole",
+    "Dylan",
+    "Evan",
+    "Felix",
+    "Gabriel",
+    "Hugo",
+    "Isaac",
+    "Jonas",
+    "Kirill",
+    "Logan",
+    "Mason",
+    "Nathan",
+    "Oskar",
+    "Quinn",
+    "Ryan",
+    "Samuel",
+    "Tyler",
+    "Victor",
+]
+# last names are spelled from these, since digits are dropped when matching names
+SYLLABLES = ["ba", "ke", "lo", "mi", "nu", "ra", "si", "to", "vo", "ze"]
+
+HOCKEY_REFERENCE_POSITIONS = {
+    "forward": ["C", "LW", "RW"],
+    "defender": ["D"],
+    "goalie": ["G"],
+}
+PUCKPEDIA_POSITIONS = {"C": "C", "LW": "L", "RW": "R", "D": "D", "G": "G"}
+
+# players per puckpedia dump file
+PUCKPEDIA_FILE_SIZE = 100
+
+
+class SyntheticLeague:
+    """
+    Generates seasons of a made-up league in the layouts the sources read, i.e.
+    hockey-reference's stats and games files and puckpedia's dumps, to run the whole
+    pipeline without crawling, e.g. in benchmarks.
+
+    Players keep their identifiers and cap hits across seasons. Every season, their
+    scoring rates vary and some of them sit out. Season totals are those of the
+    generated games, so that replaying a season adds up to its stats.
+    """
+
+    def __init__(
+        self,
+        forwards=400,
+        defenders=200,
+        goalies=70,
+        games=1312,
+        cap_median=1_500_000,
+        cap_sigma=0.9,
+        cap_minimum=750_000,
+        cap_maximum=13_000_000,
+        turnover=0.1,
+        seed=0,
+    ):
+        """
+        :param games: games played every season
+        :param cap_median: median of the log-normal distribution of cap hits
+        :param cap_sigma: standard deviation of the cap hits' logarithm
+        :param turnover: share of players missing from every season
+        """
+        self.counts = {"forward": forwards, "defender": defenders, "goalie": goalies}
+        self.games = games
+        self.cap_median = cap_median
+        self.cap_sigma = cap_sigma
+        self.cap_minimum = cap_minimum
+        self.cap_maximum = cap_maximum
+        self.turnover = turnover
+        self.seed = seed
+
+        rng = np.random.default_rng([seed, 0])
+        self.players = []
+        for player_type, count in self.counts.items():
+            for _ in range(count):
+                self.players.append(self._player(rng, len(self.players), player_type))
+
+    def _player(self, rng, i, player_type):
+        first_name = FIRST_NAMES[i % len(FIRST_NAMES)]
+        last_name = "".join(SYLLABLES[int(digit)] for digit in f"{i:04d}").title()
+        cap_hit = np.exp(rng.normal(np.log(self.cap_median), self.cap_sigma))
+        return {
+            "type": player_type,
+            "first_name": first_name,
+            "last_name": last_name,
+            "name": f"{first_name} {last_name}",
+            "player_code": f"{last_name[:5].lower()}{first_name[:2].lower()}{i:04d}",
+            "p_id": 10_000 + i,
+            "position": str(rng.choice(HOCKEY_REFERENCE_POSITIONS[player_type])),
+            "cap_hit": int(
+                np.clip(cap_hit, self.cap_minimum, self.cap_maximum) // 1000 * 1000
+            ),
+            # goals and assists per game, better paid players scoring more
+            "scoring": (0.08 if player_type == "forward" else 0.04)
+            * (cap_hit / self.cap_median) ** 0.5,
+            "availability": rng.uniform(0.5, 1.0),
+        }
+
+    def write(self, data_dir, seasons):
+        """
+        Writes the seasons' files under data_dir, in place of the crawled data.
+        :param seasons: starting years of the seasons
+        """
+        data_dir = Path(data_dir)
+        for season_start in seasons:
+            season = Season(start=season_start)
+            rng = np.random.default_rng([self.seed, season_start])
+
+            playing = rng.random(len(self.players)) >= self.turnover
+            players = [player for player, plays in zip(self.players, playing) if plays]
+            # every season, players score more or less than usual
+            form = rng.gamma(10, 1 / 10, len(players))
+
+            games = self._games(rng, season, players, form)
+            totals = self._totals(rng, players, games)
+
+            self._write_hockey_reference(data_dir, season, players, totals)
+            self._write_puckpedia(data_dir, season, players, totals)
+            _write_ndjson(
+                data_dir / "hockey_reference" / f"games_{season}.ndjson", games
+            )
+
+    def _games(self, rng, season, players, form):
+        skaters = [i for i, player in enumerate(players) if player["type"] != "goalie"]
+        goalies = [i for i, player in enumerate(players) if player["type"] == "goalie"]
+        weights = np.array([players[i]["scoring"] for i in skaters]) * form[skaters]
+        weights /= weights.sum()
+
+        first_day = datetime(season.start, 10, 7, 19)
+        days = (datetime(season.end, 4, 14, 19) - first_day).days + 1
+
+        games = []
+        for game_day in np.sort(rng.integers(0, days, self.games)):
+            date = first_day + timedelta(days=int(game_day))
+            goals = rng.poisson(3.0, 2)
+            if goals[0] == goals[1]:
+                # decided in overtime
+                goals[rng.integers(2)] += 1
+            winner = int(np.argmax(goals))
+
+            scores = []
+            for _ in range(goals.sum()):
+                scorer, *assisters = rng.choice(
+                    skaters, 1 + rng.integers(0, 3), replace=False, p=weights
+                )
+                scores.append(
+                    {
+                        "scorer": players[scorer]["name"],
+                        "assists": [players[i]["name"] for i in assisters],
+                        "scorer_code": players[scorer]["player_code"],
+                        "assist_codes": [players[i]["player_code"] for i in assisters],
+                    }
+                )
+
+            game_goalies = []
+            for side, goalie in enumerate(rng.choice(goalies, 2, replace=False)):
+                goals_against = int(goals[1 - side])
+                saves = int(rng.integers(15, 40))
+                game_goalies.append(
+                    {
+                        "decision": "W" if side == winner else "L",
+                        "name": players[goalie]["name"],
+                        "player_code": players[goalie]["player_code"],
+                        "shutout": goals_against == 0,
+                        "saves": saves,
+                        "saves_percent": round(saves / (saves + goals_against), 3),
+                    }
+                )
+
+            games.append(
+                {
+                    "date": date,
+                    "scores": scores,
+                    "goalies": game_goalies,
+                    "url": f"{BASE_URL}/boxscores/{date:%Y%m%d}0{len(games):03d}.html",
+                }
+            )
+
+        return games
+
+    @staticmethod
+    def _totals(rng, players, games):
+        """
+        :return: per player code, the player's stats over the games
+        """
+        totals = {
+            player["player_code"]: {
+                "games_played": 0,
+                "goals": 0,
+                "assists": 0,
+                "wins": 0,
+                "shutouts": 0,
+                "saves": 0,
+                "goals_against": 0,
+            }
+            for player in players
+        }
+        for game in games:
+            for score in game["scores"]:
+                totals[score["scorer_code"]]["goals"] += 1
+                for code in score["assist_codes"]:
+                    totals[code]["assists"] += 1
+            for goalie in game["goalies"]:
+                stats = totals[goalie["player_code"]]
+                stats["games_played"] += 1
+                stats["wins"] += goalie["decision"] == "W"
+                stats["shutouts"] += goalie["shutout"]
+                stats["saves"] += goalie["saves"]
+                stats["goals_against"] += round(
+                    goalie["saves"] / goalie["saves_percent"] - goalie["saves"]
+                )
+
+        # skaters' games aren't part of the games files
+        for player in players:
+            if player["type"] != "goalie":
+                totals[player["player_code"]]["games_played"] = int(
+                    rng.binomial(82, player["availability"])
+                )
+
+        return totals
+
+    @staticmethod
+    def _write_hockey_reference(data_dir, season, players, totals):
+        folder = data_dir / "hockey_reference"
+        skaters = [player for player in players if player["type"] != "goalie"]
+        goalies = [player for player in players if player["type"] == "goalie"]
+
+        def skater_rows(columns):
+            return [
+                {
+                    "player_code": player["player_code"],
+                    "name_display": player["name"],
+                    "pos": player["position"],
+                    **columns(player, totals[player["player_code"]]),
+                }
+                for player in skaters
+            ]
+
+        _write_ndjson(
+            folder / f"{season}_skaters_basic.ndjson",
+            skater_rows(
+                lambda player, stats: {
+                    "games": stats["games_played"],
+                    "goals": stats["goals"],
+                    "assists": stats["assists"],
+                    "points": stats["goals"] + stats["assists"],
+                }
+            ),
+        )
+        _write_ndjson(
+            folder / f"{season}_skaters_advanced.ndjson",
+            skater_rows(lambda player, stats: {"corsi_pct": 50.0, "fenwick_pct": 50.0}),
+        )
+        _write_ndjson(
+            folder / f"{season}_skaters_misc.ndjson",
+            skater_rows(
+                lambda player, stats: {
+                    "goals_adjusted": stats["goals"],
+                    "assists_adjusted": stats["assists"],
+                }
+            ),
+        )
+
+        goalie_rows = []
+        for player in goalies:
+            stats = totals[player["player_code"]]
+            shots_against = stats["saves"] + stats["goals_against"]
+            goalie_rows.append(
+                {
+                    "player_code": player["player_code"],
+                    "player": player["name"],
+                    "games_goalie": stats["games_played"],
+                    "wins_goalie": stats["wins"],
+                    "shutouts": stats["shutouts"],
+                    "saves": stats["saves"],
+                    "goals_against": stats["goals_against"],
+                    "save_pct": round(stats["saves"] / shots_against, 3)
+                    if shots_against
+                    else 0,
+                    "goals": 0,
+                    "assists": 0,
+                }
+            )
+        _write_ndjson(folder / f"{season}_goalies_all.ndjson", goalie_rows)
+
+    @staticmethod
+    def _write_puckpedia(data_dir, season, players, totals):
+        folder = data_dir / "puckpedia" / "manual" / f"{season.start}-{season.end}"
+        for dump, player_types in [
+            ("skaters", {"forward", "defender"}),
+            ("goalies", {"goalie"}),
+        ]:
+            records = []
+            for player in players:
+                if player["type"] not in player_types:
+                    continue
+
+                stats = totals[player["player_code"]]
+                record = {
+                    "p_id": player["p_id"],
+                    "p_fn": player["first_name"],
+                    "p_ln": player["last_name"],
+                    "p_url": f"/player/{player['p_id']}",
+                    "pos": PUCKPEDIA_POSITIONS[player["position"]],
+                    "cap_hit": f"${player['cap_hit']:,}",
+                    "st_gp": str(stats["games_played"]),
+                }
+                if dump == "goalies":
+                    record["st_w"] = str(stats["wins"])
+                    record["st_so"] = str(stats["shutouts"])
+                else:
+                    record["st_g"] = str(stats["goals"])
+                    record["st_a"] = str(stats["assists"])
+                records.append(record)
+
+            (folder / dump).mkdir(parents=True, exist_ok=True)
+            for page, start in enumerate(range(0, len(records), PUCKPEDIA_FILE_SIZE)):
+                with open(folder / dump / f"{page:03d}.json", "w") as file:
+                    json.dump(
+                        {"data": {"p": records[start : start + PUCKPEDIA_FILE_SIZE]}},
+                        file,
+                    )
+
+
+def _write_ndjson(file, records):
+    file.parent.mkdir(parents=True, exist_ok=True)
+    with open(file, "w") as lines:
+        for record in records:
+            lines.write(json.dumps(record, default=str) + "\n")
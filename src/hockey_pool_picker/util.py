@@ -1,3 +1,5 @@
+from functools import cache
+
 import pandas as pd
 from unidecode import unidecode
 
@@ -97,6 +99,7 @@ RETIRED_PLAYERS = [
 PLAYER_TYPES = ["forward", "defender", "goalie"]
 
 
+@cache
 def normalize_name(name):
     accents_removed = unidecode(name)
     to_normalize = (
@@ -108,6 +111,24 @@ def normalize_name(name):
     return "".join(filter(str.isalpha, to_normalize.lower()))
 
 
+def normalize_names(names) -> pd.Series:
+    """
+    Normalizes a series of names like normalize_name, transliterating each distinct
+    name once and handling the rest with string operations on the whole series.
+    """
+    names = pd.Series(names, dtype=object)
+    unique_names = pd.Series(names.unique(), dtype=object)
+
+    normalized = (
+        unique_names.map(unidecode)
+        .replace(corrections)
+        .str.lower()
+        # keeps letters only, like str.isalpha
+        .str.replace(r"[\W\d_]", "", regex=True)
+    )
+    return names.map(pd.Series(normalized.to_numpy(), index=unique_names))
+
+
 def massage_players(df):
     return df[df["games_played"] > 0]
 
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hockey_pool_picker.util import PLAYER_TYPES
+
+
+@pytest.fixture
+def random_pool():
+    """
+    :return: a function generating, per player type, players with random cap hits and
+    values
+    """
+
+    def generate(rng, sizes=(60, 30, 8)):
+        return [
+            pd.DataFrame(
+                {
+                    "name": [f"{j}_{i}" for i in range(size)],
+                    "player_id": np.arange(size) + 1000 * j,
+                    "weight": rng.integers(750, 12_000, size) * 1000,
+                    "value": rng.integers(0, 100, size),
+                }
+            )
+            for j, size in enumerate(sizes)
+        ]
+
+    return generate
+
+
+@pytest.fixture
+def season_pool():
+    """
+    :return: a function generating, per player type, players' random stats over a
+    season, goalies having their own stats
+    """
+
+    def generate(rng, sizes=(40, 20, 6)):
+        pool = []
+        for player_type, size in zip(PLAYER_TYPES, sizes):
+            games_played = rng.integers(10, 83, size)
+            players = pd.DataFrame(
+                {
+                    "games_played": games_played,
+                    "goals": rng.binomial(games_played, 0.3),
+                    "assists": rng.binomial(games_played, 0.4),
+                }
+            )
+            if player_type == "goalie":
+                players["wins"] = rng.binomial(games_played, 0.5)
+                players["shutouts"] = rng.binomial(players["wins"], 0.1)
+                players["saves_percent"] = rng.uniform(0.88, 0.93, size)
+            pool.append(players)
+        return pool
+
+    return generate
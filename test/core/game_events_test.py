@@ -0,0 +1,157 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from hockey_pool_picker.core.game_events import GameEvents
+from hockey_pool_picker.core.season import Season
+from hockey_pool_picker.core.season_simulator import SeasonSimulator
+from hockey_pool_picker.core.stats_index import DailyStatsIndex
+
+games = pd.DataFrame(
+    {
+        "date": [datetime(2022, 10, 7), datetime(2022, 10, 8), datetime(2022, 11, 2)],
+        "scores": [
+            [
+                {"scorer": "Connor McDavid", "assists": ["Leon Draisaitl"]},
+                {"scorer": "Leon Draisaitl", "assists": []},
+            ],
+            [],
+            [
+                {
+                    "scorer": "Connor McDavid",
+                    "assists": ["Leon Draisaitl", "Evan Bouchard"],
+                }
+            ],
+        ],
+        "goalies": [
+            [
+                {
+                    "decision": "W",
+                    "name": "Stuart Skinner",
+                    "shutout": True,
+                    "saves": 30,
+                    "saves_percent": 1.0,
+                },
+                {
+                    "decision": "L",
+                    "name": "Carey Price",
+                    "shutout": False,
+                    "saves": 20,
+                    "saves_percent": 0.9,
+                },
+            ],
+            [
+                {
+                    "decision": "W",
+                    "name": "Stuart Skinner",
+                    "shutout": False,
+                    "saves": 25,
+                    "saves_percent": None,
+                }
+            ],
+            [
+                {
+                    "decision": "L",
+                    "name": "Stuart Skinner",
+                    "shutout": False,
+                    "saves": 25,
+                    "saves_percent": 0.8,
+                }
+            ],
+        ],
+    }
+)
+
+
+def test_stats_over_window():
+    stats = GameEvents(games).stats(datetime(2022, 10, 1), datetime(2022, 10, 31))
+
+    assert stats.loc["Connor McDavid", "goals"] == 1
+    assert stats.loc["Leon Draisaitl", "goals"] == 1
+    assert stats.loc["Leon Draisaitl", "assists"] == 1
+    assert "Evan Bouchard" not in stats.index
+
+    skinner = stats.loc["Stuart Skinner"]
+    assert skinner["wins"] == 2
+    assert skinner["shutouts"] == 1
+    assert skinner["games_played"] == 2
+    assert skinner["saves_percent"] == 1.0
+
+    assert stats.loc["Carey Price", "wins"] == 0
+    assert stats.loc["Carey Price", "saves_percent"] == 0.9
+
+
+def test_stats_over_whole_season():
+    stats = GameEvents(games).stats(datetime(2022, 10, 1), datetime(2023, 4, 30))
+
+    assert stats.loc["Connor McDavid", "goals"] == 2
+    assert stats.loc["Leon Draisaitl", "assists"] == 2
+    assert stats.loc["Evan Bouchard", "assists"] == 1
+    assert stats.loc["Stuart Skinner", "games_played"] == 3
+    assert stats.loc["Stuart Skinner", "saves_percent"] == pytest.approx(0.9)
+
+
+@pytest.mark.parametrize(
+    "start,end",
+    [
+        (datetime(2022, 10, 1), datetime(2022, 10, 31, 23, 59)),
+        (datetime(2022, 10, 8), datetime(2022, 11, 2)),
+        (datetime(2022, 10, 9), datetime(2022, 11, 1)),
+        (datetime(2022, 9, 1), datetime(2023, 4, 30)),
+    ],
+)
+def test_daily_index_matches_events(start, end):
+    expected = GameEvents(games).stats(start, end)
+    actual = DailyStatsIndex(games).stats(start, end)
+
+    actual = actual.loc[actual[["goals", "assists", "games_played"]].sum(axis=1) > 0]
+    pd.testing.assert_frame_equal(
+        actual.sort_index(), expected.sort_index(), check_names=False
+    )
+
+
+def test_stats_keyed_by_player_code():
+    games_with_codes = pd.DataFrame(
+        {
+            "date": [datetime(2022, 10, 7)],
+            "scores": [
+                [
+                    {
+                        "scorer": "Matt Murray",
+                        "scorer_code": "murrama03",
+                        "assists": ["Matt Murray"],
+                        "assist_codes": ["murrama02"],
+                    }
+                ]
+            ],
+            "goalies": [[]],
+        }
+    )
+
+    events = GameEvents(games_with_codes)
+    stats = events.stats(datetime(2022, 10, 1), datetime(2022, 10, 31))
+    assert events.key == "player_code"
+    assert stats.loc["murrama03", "goals"] == 1
+    assert stats.loc["murrama02", "assists"] == 1
+    assert DailyStatsIndex(games_with_codes).key == "player_code"
+
+
+def test_simulator_warns_about_names_shared_in_games_keyed_by_name():
+    present_pool = [
+        pd.DataFrame({"name": ["Sebastian Aho", "Connor McDavid"]}),
+        pd.DataFrame({"name": ["Sebastian Aho"]}),
+        pd.DataFrame({"name": ["Stuart Skinner"]}),
+    ]
+    simulator = SeasonSimulator(
+        None,
+        Season(2022),
+        present_pool,
+        0,
+        None,
+        None,
+        stats_index=DailyStatsIndex(games),
+    )
+
+    with pytest.warns(UserWarning, match="Sebastian Aho$"):
+        simulator._warn_shared_names()
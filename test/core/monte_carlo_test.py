@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from hockey_pool_picker.core.monte_carlo import PERIOD_GAMES, MonteCarloSeason
+from hockey_pool_picker.core.solver import Solution
+from hockey_pool_picker.core.strategy import STRATEGIES, MarqueurValueStrategy
+from hockey_pool_picker.util import PLAYER_TYPES
+
+
+def test_simulated_seasons_average_to_past_season(season_pool):
+    pool = season_pool(np.random.default_rng(0))
+    season = MonteCarloSeason(pool, simulations=4000, seed=1)
+
+    forwards = season.stats(0, range(40))
+    assert forwards["goals"].shape == (4000, 40, len(PERIOD_GAMES))
+    np.testing.assert_allclose(
+        forwards["goals"].sum(axis=2).mean(axis=0), pool[0]["goals"], rtol=0.1, atol=1
+    )
+
+    goalies = season.stats(2, range(6))
+    assert (goalies["shutouts"] <= goalies["wins"]).all()
+    assert (goalies["wins"] <= goalies["games_played"]).all()
+
+
+def test_values_of_linear_strategy_average_to_past_value(season_pool):
+    pool = season_pool(np.random.default_rng(2))
+    strategy = MarqueurValueStrategy()
+    valued_pool = [
+        players.assign(value=strategy.apply(players, player_type), weight=0)
+        for players, player_type in zip(pool, PLAYER_TYPES)
+    ]
+    solution = Solution(valued_pool, [range(12), range(6), range(2)])
+
+    totals = MonteCarloSeason(pool, simulations=4000, seed=3).total_values(
+        solution, strategy
+    )
+
+    assert totals.shape == (4000,)
+    assert totals.mean() == pytest.approx(solution.value(), rel=0.02)
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES.keys())
+def test_every_strategy_evaluates_simulations(strategy, season_pool):
+    pool = season_pool(np.random.default_rng(4))
+    valued_pool = [players.assign(value=0, weight=0) for players in pool]
+    solution = Solution(valued_pool, [range(12), range(6), range(2)])
+    season = MonteCarloSeason(pool, simulations=10, dispersion=5, seed=5)
+
+    values = season.values(solution, STRATEGIES[strategy]())
+
+    assert values.shape == (10, len(PERIOD_GAMES))
@@ -0,0 +1,37 @@
+from hockey_pool_picker.core.pruning import prune_dominated
+
+
+def test_prune_dominated():
+    values = [10, 8, 8, 5, 5, 1]
+    weights = [1, 1, 2, 3, 3, 1]
+
+    # 1 is dominated by 0, 2 by 0 and 1, 3 by 0, 1 and 2, 4 by 0 to 3 (ties are
+    # broken by position) and 5 by 0 and 1.
+    assert prune_dominated(values, weights, 2).tolist() == [
+        True,
+        True,
+        False,
+        False,
+        False,
+        False,
+    ]
+    assert prune_dominated(values, weights, 3).tolist() == [
+        True,
+        True,
+        True,
+        False,
+        False,
+        True,
+    ]
+
+
+def test_prune_dominated_keeps_players():
+    values = [10, 8, 8, 5]
+    weights = [1, 1, 2, 3]
+
+    assert prune_dominated(values, weights, 1, keep=[3]).tolist() == [
+        True,
+        False,
+        False,
+        True,
+    ]
@@ -0,0 +1,239 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hockey_pool_picker import profiling
+from hockey_pool_picker.core.solver import (
+    CPSATSolver,
+    KnapsackSolver,
+    NoSolutionError,
+    PICKS_COUNT,
+)
+
+SALARY_CAP = 83_500_000
+
+
+def revalue(rng, pool):
+    return [group.assign(value=rng.integers(0, 30, len(group))) for group in pool]
+
+
+def test_pick_pool_respects_team_structure(random_pool):
+    pool = random_pool(np.random.default_rng(0))
+    solution = CPSATSolver().pick_pool(pool, SALARY_CAP)
+
+    assert [len(group) for group in solution.pick_indices] == PICKS_COUNT
+    assert solution.weight() <= SALARY_CAP
+
+
+def test_pick_trades_reuses_model_across_periods(random_pool):
+    rng = np.random.default_rng(1)
+    pool = random_pool(rng)
+    solver = CPSATSolver()
+    solution = solver.pick_pool(pool, SALARY_CAP)
+
+    for _ in range(4):
+        period_pool = revalue(rng, pool)
+        traded = solver.pick_trades(solution, period_pool, SALARY_CAP, 3)
+        from_scratch = CPSATSolver().pick_trades(solution, period_pool, SALARY_CAP, 3)
+
+        assert traded.value() == from_scratch.value()
+        kept = sum(
+            len(set(before) & set(after))
+            for before, after in zip(solution.pick_indices, traded.pick_indices)
+        )
+        assert kept >= sum(PICKS_COUNT) - 3
+        solution = traded
+
+
+def test_pick_trades_keeps_model_size(random_pool):
+    rng = np.random.default_rng(9)
+    pool = random_pool(rng)
+    solver = CPSATSolver()
+    solution = solver.pick_pool(pool, SALARY_CAP)
+
+    sizes = set()
+    for trades_count in [3, 1, 5, 2]:
+        solution = solver.pick_trades(
+            solution, revalue(rng, pool), SALARY_CAP, trades_count
+        )
+        proto = solver.model.Proto()
+        sizes.add((len(proto.variables), len(proto.constraints)))
+
+    assert len(sizes) == 1
+
+
+def test_pick_trades_uses_every_worker(monkeypatch, random_pool):
+    from ortools.sat.python import cp_model
+
+    logs = []
+
+    class LoggingCpSolver(cp_model.CpSolver):
+        def Solve(self, model, *args):
+            self.parameters.log_search_progress = True
+            self.parameters.log_to_stdout = False
+            self.parameters.log_to_response = True
+            status = super().Solve(model, *args)
+            logs.append(self.ResponseProto().solve_log)
+            return status
+
+    monkeypatch.setattr(cp_model, "CpSolver", LoggingCpSolver)
+
+    rng = np.random.default_rng(10)
+    pool = random_pool(rng)
+    solver = CPSATSolver(num_workers=4)
+    solution = solver.pick_pool(pool, SALARY_CAP)
+    for _ in range(2):
+        solution = solver.pick_trades(solution, revalue(rng, pool), SALARY_CAP, 3)
+
+    assert len(logs) == 3
+    for log in logs:
+        assert "with 4 workers" in log
+        assert "sequential search" not in log
+
+
+def test_knapsack_solver_matches_cpsat(random_pool):
+    rng = np.random.default_rng(2)
+    pool = random_pool(rng)
+    expected = CPSATSolver().pick_pool(pool, SALARY_CAP)
+    solution = KnapsackSolver().pick_pool(pool, SALARY_CAP)
+
+    assert [len(group) for group in solution.pick_indices] == PICKS_COUNT
+    assert solution.weight() <= SALARY_CAP
+    assert solution.value() == expected.value()
+
+    for _ in range(3):
+        period_pool = revalue(rng, pool)
+        expected = CPSATSolver().pick_trades(solution, period_pool, SALARY_CAP, 3)
+        traded = KnapsackSolver().pick_trades(solution, period_pool, SALARY_CAP, 3)
+
+        assert traded.weight() <= SALARY_CAP
+        assert traded.value() == expected.value()
+        kept = sum(
+            len(set(before) & set(after))
+            for before, after in zip(solution.pick_indices, traded.pick_indices)
+        )
+        assert kept >= sum(PICKS_COUNT) - 3
+        solution = traded
+
+
+def test_knapsack_solver_requires_integral_values(random_pool):
+    pool = random_pool(np.random.default_rng(3))
+    pool[0]["value"] = pool[0]["value"].astype(float)
+    pool[0].loc[0, "value"] = 1000.5
+
+    with pytest.raises(ValueError):
+        KnapsackSolver().pick_pool(pool, SALARY_CAP)
+
+
+def test_pruning_keeps_optimal_value(random_pool):
+    rng = np.random.default_rng(4)
+    pool = random_pool(rng, sizes=(200, 100, 20))
+    solver = CPSATSolver()
+    solution = solver.pick_pool(pool, SALARY_CAP)
+    unpruned = CPSATSolver(prune=False).pick_pool(pool, SALARY_CAP)
+
+    assert solver.pruning_stats[0]["pruned"] > 0
+    assert solution.value() == unpruned.value()
+
+    # players pruned in a period can be picked in the next one
+    for _ in range(3):
+        period_pool = revalue(rng, pool)
+        traded = solver.pick_trades(solution, period_pool, SALARY_CAP, 3)
+        unpruned = CPSATSolver(prune=False).pick_trades(
+            solution, period_pool, SALARY_CAP, 3
+        )
+        assert traded.value() == unpruned.value()
+
+        proto = solver.model.Proto()
+        assert not proto.assumptions
+        fixed = sum(list(variable.domain) == [0, 0] for variable in proto.variables)
+        assert fixed == sum(stats["pruned"] for stats in solver.pruning_stats)
+
+
+@pytest.mark.parametrize(
+    "solver",
+    [CPSATSolver(), CPSATSolver(max_time=5, relative_gap=0.5), KnapsackSolver()],
+)
+def test_no_solution_under_salary_cap(solver, random_pool):
+    pool = random_pool(np.random.default_rng(5))
+
+    with pytest.raises(NoSolutionError):
+        solver.pick_pool(pool, 1_000_000)
+
+
+@pytest.mark.parametrize("relative_gap", [0.5, 0.2, 0.05])
+def test_solution_within_relative_gap(relative_gap, random_pool):
+    pool = random_pool(np.random.default_rng(6))
+    optimal = CPSATSolver().pick_pool(pool, SALARY_CAP)
+
+    profiler = profiling.enable()
+    try:
+        solution = CPSATSolver(num_workers=1, relative_gap=relative_gap).pick_pool(
+            pool, SALARY_CAP
+        )
+    finally:
+        profiling.disable()
+
+    # the gap is measured even when stopping within it is reported as optimal
+    (solve,) = profiler.solves
+    assert solution.value() == solve["objective"]
+    assert solution.gap == pytest.approx(
+        (solve["bound"] - solve["objective"]) / solve["bound"]
+    )
+    assert 0 <= solution.gap <= relative_gap
+    assert solution.value() >= optimal.value() * (1 - relative_gap)
+
+
+@pytest.mark.parametrize("solver", [CPSATSolver, KnapsackSolver])
+def test_pick_pools_returns_distinct_teams(solver, random_pool):
+    pool = random_pool(np.random.default_rng(7))
+    best = CPSATSolver().pick_pool(pool, SALARY_CAP)
+    solutions = solver().pick_pools(pool, SALARY_CAP, 4, min_distance=2)
+
+    assert len(solutions) == 4
+    values = [solution.value() for solution in solutions]
+    assert values[0] == best.value()
+    assert values == sorted(values, reverse=True)
+
+    teams = [
+        {(i, j) for j, group in enumerate(solution.pick_indices) for i in group}
+        for solution in solutions
+    ]
+    for k, team in enumerate(teams):
+        for other in teams[k + 1 :]:
+            assert len(team - other) >= 2
+
+
+def test_knapsack_solver_pick_pools_matches_cpsat(random_pool):
+    pool = random_pool(np.random.default_rng(11))
+    expected = CPSATSolver().pick_pools(pool, SALARY_CAP, 5)
+    solutions = KnapsackSolver().pick_pools(pool, SALARY_CAP, 5)
+
+    assert [solution.value() for solution in solutions] == [
+        solution.value() for solution in expected
+    ]
+    assert KnapsackSolver().pick_pools(pool, 1_000_000, 5) == []
+
+
+def test_translate_finds_picks_in_other_pool(capsys, random_pool):
+    rng = np.random.default_rng(8)
+    past_pool = random_pool(rng)
+    solution = CPSATSolver().pick_pool(past_pool, SALARY_CAP)
+
+    # the present pool is shuffled and is missing one of the picked forwards
+    missing = past_pool[0]["name"].iloc[solution.pick_indices[0][0]]
+    present_pool = [
+        group.sample(frac=1, random_state=0).reset_index(drop=True)
+        for group in past_pool
+    ]
+    present_pool[0] = present_pool[0][present_pool[0]["name"] != missing]
+    index = [
+        pd.Series(np.arange(len(group)), index=group["name"].to_numpy())
+        for group in present_pool
+    ]
+
+    translated = solution.translate(present_pool, index, "name")
+
+    for before, after in zip(solution.picks(), translated.picks()):
+        assert set(after["name"]) == set(before["name"]) - {missing}
+    assert missing in capsys.readouterr().out
@@ -0,0 +1,54 @@
+from typing import ClassVar
+
+import numpy as np
+import pytest
+
+from hockey_pool_picker.core.strategy import (
+    STRATEGIES,
+    Coefficients,
+    MarqueurValueStrategy,
+    ValueStrategy,
+    evaluate_strategies,
+)
+from hockey_pool_picker.util import PLAYER_TYPES
+
+
+@pytest.mark.parametrize("player_type", PLAYER_TYPES)
+def test_evaluate_strategies_matches_apply(player_type, season_pool):
+    pool = season_pool(np.random.default_rng(0), sizes=(50, 50, 50))
+    df = pool[PLAYER_TYPES.index(player_type)]
+    strategies = {name: strategy() for name, strategy in STRATEGIES.items()}
+
+    values = evaluate_strategies(df, player_type, strategies)
+
+    assert list(values.columns) == list(STRATEGIES)
+    for name, strategy in strategies.items():
+        np.testing.assert_allclose(
+            values[name], strategy.apply(df, player_type), err_msg=name
+        )
+
+
+def test_evaluate_strategies_keeps_integer_values(season_pool):
+    df = season_pool(np.random.default_rng(1))[0]
+
+    values = evaluate_strategies(df, "forward", {"marqueur": MarqueurValueStrategy()})
+
+    assert np.issubdtype(values["marqueur"].dtype, np.integer)
+
+
+def test_evaluate_strategies_expects_columns(season_pool):
+    df = season_pool(np.random.default_rng(2))[2].drop(columns="shutouts")
+
+    with pytest.raises(ValueError, match="shutouts"):
+        evaluate_strategies(df, "goalie", {"marqueur": MarqueurValueStrategy()})
+
+
+def test_strategies_must_value_every_player_type():
+    class ForwardsOnlyStrategy(ValueStrategy):
+        coefficients: ClassVar[Coefficients] = {"forward": {"goals": 1}}
+
+        def forward(self, player):
+            return self._linear_value(player, "forward")
+
+    with pytest.raises(TypeError, match="abstract"):
+        ForwardsOnlyStrategy()
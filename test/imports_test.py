@@ -0,0 +1,24 @@
+import subprocess
+import sys
+
+
+def test_entry_points_defer_heavy_imports():
+    # a fresh interpreter, since this one already imported everything
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            (
+                "import sys\n"
+                "import hockey_pool_picker.pick_pool, hockey_pool_picker.backtest\n"
+                "print(' '.join(sys.modules))"
+            ),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modules = set(result.stdout.split())
+    assert not modules & {"bs4", "ortools", "requests_cache", "requests"}
+    assert result.stdout.count("\n") == 1, "nothing else is printed when importing"
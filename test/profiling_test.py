@@ -0,0 +1,49 @@
+import json
+
+import numpy as np
+
+from hockey_pool_picker import profiling
+from hockey_pool_picker.core.solver import CPSATSolver
+
+
+def test_spans_nest_and_accumulate():
+    profiler = profiling.Profiler()
+    for _ in range(3):
+        with profiler.span("season"), profiler.span("pick_trades"):
+            profiler.count("trades", 2)
+
+    assert list(profiler.spans) == ["season", "season/pick_trades"]
+    assert profiler.spans["season/pick_trades"]["calls"] == 3
+    assert (
+        profiler.spans["season"]["total"]
+        >= profiler.spans["season/pick_trades"]["total"]
+    )
+    assert profiler.counters == {"trades": 6}
+
+
+def test_helpers_do_nothing_when_disabled():
+    profiling.disable()
+
+    with profiling.span("load"):
+        profiling.count("players")
+        profiling.record_solve(wall_time=1.0)
+
+    assert profiling.profiler() is None
+
+
+def test_profiled_run_records_cpsat_solves(tmp_path, capsys, random_pool):
+    rng = np.random.default_rng(0)
+    pool = random_pool(rng)
+    file = tmp_path / "profile.json"
+
+    with profiling.profiled(str(file)):
+        CPSATSolver().pick_pool(pool, 83_500_000)
+
+    profile = json.loads(file.read_text())
+    assert set(profile["spans"]) >= {"pick_pool", "pick_pool/solve"}
+    (solve,) = profile["solves"]
+    assert solve["span"] == "pick_pool"
+    assert solve["status"] == "OPTIMAL"
+    assert solve["objective"] == solve["bound"]
+    assert "1 solves in" in capsys.readouterr().out
+    assert profiling.profiler() is None
@@ -0,0 +1,55 @@
+import numpy as np
+
+from hockey_pool_picker.core.solver import CPSATSolver
+from hockey_pool_picker.run_store import RunStore
+from hockey_pool_picker.sources.data_dir import ENVIRONMENT_VARIABLE
+
+SALARY_CAP = 83_500_000
+
+
+def test_records_and_compares_runs(tmp_path, monkeypatch, random_pool):
+    monkeypatch.setenv(ENVIRONMENT_VARIABLE, str(tmp_path))
+    rng = np.random.default_rng(0)
+    pool = random_pool(rng, sizes=(40, 20, 6))
+    solver = CPSATSolver()
+    pick = solver.pick_pool(pool, SALARY_CAP)
+    revalued = [group.assign(value=rng.integers(0, 30, len(group))) for group in pool]
+    traded = solver.pick_trades(pick, revalued, SALARY_CAP, 3)
+
+    store = RunStore()
+    first = store.record(
+        "backtest",
+        {"season": 2022, "picking_strategy": "marqueur"},
+        total_value=30,
+        period_values={"Oct 2022": 10, "Nov 2022": 20},
+        lineups={"pick": pick.lineup(), "Nov 2022": traded.lineup()},
+        trades={"Oct 2022": pick.differences(traded)},
+        trades_solve_times={"Oct 2022": traded.solve_time},
+        timings={"pick_solve_time": pick.solve_time},
+    )
+    second = store.record(
+        "backtest",
+        {"season": 2022, "picking_strategy": "moneyball"},
+        total_value=25,
+        period_values={"Oct 2022": 12, "Nov 2022": 13},
+    )
+
+    runs = RunStore().runs("backtest", picking_strategy="moneyball")
+    assert runs["id"].tolist() == [second]
+    assert runs["season"].tolist() == [2022]
+    # parameter names are bound, not spliced in the SQL
+    assert RunStore().runs("backtest", **{"season') = 2022 OR ('": 1}).empty
+
+    values = store.period_values([first, second])
+    assert values.index.tolist() == ["Oct 2022", "Nov 2022"]
+    assert values[first].tolist() == [10, 20]
+
+    lineup = store.lineup(first)
+    assert len(lineup) == 20
+    assert lineup["value"].sum() == pick.value()
+    assert sorted(lineup["player_id"]) == sorted(pick.lineup()["player_id"])
+
+    trades = store.trades(first)
+    removed, added = pick.differences(traded)
+    assert (trades["direction"] == "out").sum() == len(removed) <= 3
+    assert (trades["direction"] == "in").sum() == len(added)
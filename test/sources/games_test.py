@@ -0,0 +1,198 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import timedelta
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+import requests
+import requests_cache
+
+from hockey_pool_picker.core.season import Season
+from hockey_pool_picker.sources import ndjson
+from hockey_pool_picker.sources.crawl_cache import NotCachedError
+from hockey_pool_picker.sources.games import hockey_reference
+from hockey_pool_picker.sources.games.hockey_reference import HockeyReferenceGamesSource
+from hockey_pool_picker.sources.rate_limit import TokenBucket
+
+FIXTURES = Path(__file__).parent.parent / "fixtures" / "hockey_reference"
+
+
+class RecordingHandler(SimpleHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requested.append(self.path)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """
+    Serves recorded hockey-reference pages from the fixtures folder.
+    """
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), partial(RecordingHandler, directory=FIXTURES)
+    )
+    server.requested = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def source(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(ndjson, "base_dir", tmp_path)
+    (tmp_path / "data" / "hockey_reference").mkdir(parents=True)
+    return HockeyReferenceGamesSource(
+        Season(start=2022),
+        session=requests.Session(),
+        base_url=f"http://127.0.0.1:{server.server_port}",
+    )
+
+
+def read_games(source):
+    with open(ndjson.data_path(source.file_name())) as file:
+        return [json.loads(line) for line in file]
+
+
+def test_crawl_concurrently_matches_crawl(source, monkeypatch):
+    monkeypatch.setattr(hockey_reference, "CRAWL_DELAY", timedelta(0))
+    source.crawl()
+    expected = read_games(source)
+
+    source.crawl_concurrently(concurrency=2, delay=timedelta(milliseconds=1))
+    games = read_games(source)
+
+    assert games == expected
+    assert [game["date"] for game in games] == [
+        "2022-10-07 19:00:00",
+        "2022-10-08 19:00:00",
+    ]
+    assert games[0]["scores"][0] == {
+        "scorer": "Connor McDavid",
+        "assists": ["Leon Draisaitl", "Evan Bouchard"],
+        "scorer_code": "mcdavco01",
+        "assist_codes": ["draisle01", "bouchev01"],
+    }
+    assert [goalie["player_code"] for goalie in games[0]["goalies"]] == [
+        "skinnst01",
+        "murrama02",
+    ]
+    assert not source.checkpoint_file().exists()
+
+
+def test_crawl_concurrently_resumes_from_checkpoint(source, server):
+    checkpointed = {
+        "date": "2022-10-07 19:00:00",
+        "scores": [],
+        "goalies": [],
+        "url": f"{source.base_url}/boxscores/202210070TOR.html",
+    }
+    with open(source.checkpoint_file(), "w") as file:
+        file.write(json.dumps(checkpointed) + "\n")
+
+    source.crawl_concurrently(delay=timedelta(milliseconds=1))
+
+    assert "/boxscores/202210070TOR.html" not in server.requested
+    assert "/boxscores/202210080MTL.html" in server.requested
+    games = read_games(source)
+    assert games[0] == checkpointed
+    assert games[1]["goalies"][0]["name"] == "Ilya Samsonov"
+
+
+def test_crawl_concurrently_keeps_checkpoint_when_a_game_fails(source, monkeypatch):
+    get_game = source._get_game
+
+    def failing_get_game(link):
+        if link.endswith("202210080MTL.html"):
+            # fails once the other game is in
+            time.sleep(0.2)
+            raise Exception(f"Failed to crawl game {link}")
+        return get_game(link)
+
+    monkeypatch.setattr(source, "_get_game", failing_get_game)
+
+    with pytest.raises(Exception, match="202210080MTL"):
+        source.crawl_concurrently(concurrency=2, delay=timedelta(milliseconds=1))
+
+    with open(source.checkpoint_file()) as file:
+        checkpointed = [json.loads(line)["url"] for line in file]
+    assert checkpointed == [f"{source.base_url}/boxscores/202210070TOR.html"]
+    assert not ndjson.data_path(source.file_name()).exists()
+
+
+def test_token_bucket_limits_rate():
+    async def acquire_all(rate_limiter, count):
+        await asyncio.gather(*(rate_limiter.acquire() for _ in range(count)))
+
+    start = time.monotonic()
+    asyncio.run(acquire_all(TokenBucket(rate=100), 6))
+
+    # the first token is available right away
+    assert time.monotonic() - start >= 0.05
+
+
+def write_games(source, games):
+    with open(ndjson.data_path(source.file_name()), "w") as file:
+        for game in games:
+            file.write(json.dumps(game) + "\n")
+
+
+@pytest.mark.parametrize(
+    "captured",
+    [
+        {
+            "date": "2022-10-07 19:00:00",
+            "scores": [],
+            "goalies": [],
+            "url": "/boxscores/202210070TOR.html",
+        },
+        # games crawled before urls were stored are matched on their day
+        {"date": "2022-10-07 19:00:00", "scores": [], "goalies": []},
+    ],
+)
+def test_incremental_crawl_appends_new_games(source, server, monkeypatch, captured):
+    monkeypatch.setattr(hockey_reference, "CRAWL_DELAY", timedelta(0))
+    if "url" in captured:
+        captured["url"] = source.base_url + captured["url"]
+    write_games(source, [captured])
+
+    source.crawl(incremental=True)
+
+    assert "/boxscores/202210070TOR.html" not in server.requested
+    games = read_games(source)
+    assert games[0] == captured
+    assert [game["url"] for game in games[1:]] == [
+        f"{source.base_url}/boxscores/202210080MTL.html"
+    ]
+
+
+def test_rebuild_from_cache_parses_cached_pages(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(ndjson, "base_dir", tmp_path)
+    (tmp_path / "data" / "hockey_reference").mkdir(parents=True)
+    source = HockeyReferenceGamesSource(
+        Season(start=2022),
+        session=requests_cache.CachedSession(backend="memory"),
+        base_url=f"http://127.0.0.1:{server.server_port}",
+    )
+    source.crawl_concurrently(delay=timedelta(milliseconds=1))
+    expected = read_games(source)
+    requested = len(server.requested)
+
+    source.rebuild_from_cache(workers=2)
+
+    assert read_games(source) == expected
+    assert len(server.requested) == requested
+
+
+def test_rebuild_from_cache_requires_cached_pages(source):
+    source.session = requests_cache.CachedSession(backend="memory")
+
+    with pytest.raises(NotCachedError):
+        source.rebuild_from_cache(workers=1)
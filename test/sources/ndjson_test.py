@@ -0,0 +1,83 @@
+import os
+import pickle
+
+from hockey_pool_picker.sources import ndjson
+
+
+def write_games(path, rows):
+    with open(path, "w") as file:
+        file.write("\n".join(rows) + "\n")
+
+
+def test_read_to_df_serves_from_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(ndjson, "base_dir", tmp_path)
+    (tmp_path / "data").mkdir()
+    file = tmp_path / "data" / "games.ndjson"
+    write_games(file, ['{"date":"2022-10-07 19:00:00","scores":[{"scorer":"A"}]}'])
+
+    df = ndjson.read_to_df("games.ndjson", dates=["date"])
+    assert (tmp_path / "data" / "games.ndjson.cache").exists()
+
+    cached = ndjson.read_to_df("games.ndjson", dates=["date"])
+    assert cached.equals(df)
+    assert cached["scores"][0] == [{"scorer": "A"}]
+    assert str(cached["date"].dtype).startswith("datetime64")
+
+
+def test_read_to_df_invalidates_cache_on_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(ndjson, "base_dir", tmp_path)
+    (tmp_path / "data").mkdir()
+    file = tmp_path / "data" / "games.ndjson"
+    write_games(file, ['{"name":"A"}'])
+    assert len(ndjson.read_to_df("games.ndjson")) == 1
+
+    write_games(file, ['{"name":"A"}', '{"name":"B"}'])
+    stat = file.stat()
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert len(ndjson.read_to_df("games.ndjson")) == 2
+
+
+def test_read_to_df_rebuilds_unreadable_cache(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(ndjson, "base_dir", tmp_path)
+    (tmp_path / "data").mkdir()
+    file = tmp_path / "data" / "games.ndjson"
+    write_games(file, ['{"name":"A"}'])
+    ndjson.read_to_df("games.ndjson")
+
+    # a cache pickled with a class that no longer exists
+    cache_file = tmp_path / "data" / "games.ndjson.cache"
+    with open(cache_file, "rb") as cache:
+        key = pickle.load(cache)
+    with open(cache_file, "wb") as cache:
+        pickle.dump(key, cache)
+        cache.write(b"chockey_pool_picker.sources.ndjson\nRemovedFrame\n.")
+
+    assert ndjson.read_to_df("games.ndjson")["name"].tolist() == ["A"]
+    assert "RemovedFrame" in caplog.text
+    # the cache is usable again
+    assert ndjson._read_cache(cache_file, key) is not None
+
+
+def test_read_to_df_rebuilds_truncated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(ndjson, "base_dir", tmp_path)
+    (tmp_path / "data").mkdir()
+    write_games(tmp_path / "data" / "games.ndjson", ['{"name":"A"}'])
+    ndjson.read_to_df("games.ndjson")
+
+    cache_file = tmp_path / "data" / "games.ndjson.cache"
+    cache_file.write_bytes(cache_file.read_bytes()[:-10])
+
+    assert ndjson.read_to_df("games.ndjson")["name"].tolist() == ["A"]
+
+
+def test_written_files_are_read_from_any_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(ndjson, "base_dir", tmp_path / "repo")
+    (tmp_path / "repo" / "data").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+
+    ndjson.write("games.ndjson", [{"name": "A"}])
+    ndjson.append("games.ndjson", [{"name": "B"}])
+
+    assert ndjson.read_to_df("games.ndjson")["name"].tolist() == ["A", "B"]
+    assert not (tmp_path / "data").exists()
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import pytest
+
+from hockey_pool_picker.sources.games.hockey_reference import HockeyReferenceGamesSource
+from hockey_pool_picker.sources.parsing import DocumentPage, Page
+
+BOX_SCORES = (
+    Path(__file__).parent.parent / "fixtures" / "hockey_reference" / "boxscores"
+)
+
+page = """
+<div id="all_stats" class="table_wrapper">
+  <div class="section_heading"><h2>Stats</h2></div>
+  <!--
+  <table id="stats"><tr><td>commented</td></tr></table>
+  -->
+  <table id="stats_adv"><tr><td>advanced</td></tr></table>
+</div>
+"""
+
+
+def test_finds_commented_tables():
+    assert Page(page).find("table", id="stats").text == "commented"
+    assert Page(page).find("table", id="stats_adv").text == "advanced"
+    assert Page(page).find("table", id="missing") is None
+
+
+def test_finds_whole_element_with_nested_tags():
+    element = Page(page).find("div", class_="table_wrapper")
+
+    assert element["id"] == "all_stats"
+    assert element.find("table", id="stats_adv") is not None
+
+
+@pytest.mark.parametrize(
+    "file", sorted(BOX_SCORES.glob("*.html")), ids=lambda f: f.name
+)
+def test_parses_games_like_whole_documents(file):
+    content = file.read_bytes()
+
+    assert HockeyReferenceGamesSource._parse_game(
+        content
+    ) == HockeyReferenceGamesSource._parse_game(content, DocumentPage)
@@ -0,0 +1,74 @@
+import pytest
+
+from hockey_pool_picker.core.season import Season
+from hockey_pool_picker.sources import player_registry
+from hockey_pool_picker.sources.player_registry import PlayerRegistry
+
+
+def test_links_sources_by_name_and_persists(tmp_path, monkeypatch):
+    monkeypatch.setattr(player_registry, "base_dir", tmp_path)
+
+    registry = PlayerRegistry()
+    mcdavid, marner = registry.ids(
+        "hockey_reference",
+        ["mcdavco01", "marnemi01"],
+        ["Connor McDavid", "Mitch Marner"],
+    )
+    # names are linked through the corrections, e.g. Mitchell -> Mitch
+    assert list(
+        registry.ids("puckpedia", [1, 2], ["Mitchell Marner", "Connor McDavid"])
+    ) == [marner, mcdavid]
+
+    # players are only written to the file when saved
+    assert not registry.file.exists()
+    registry.save()
+
+    reloaded = PlayerRegistry()
+    assert list(reloaded.ids("puckpedia", [2, 1])) == [mcdavid, marner]
+    assert list(reloaded.ids("hockey_reference", ["marnemi01"])) == [marner]
+
+
+def test_players_with_the_same_name_are_told_apart(tmp_path, monkeypatch):
+    monkeypatch.setattr(player_registry, "base_dir", tmp_path)
+
+    registry = PlayerRegistry()
+    (aho_forward,) = registry.ids(
+        "hockey_reference", ["ahose01"], ["Sebastian Aho"], "forward", Season(2022)
+    )
+    (aho_defender,) = registry.ids(
+        "hockey_reference", ["ahose02"], ["Sebastian Aho"], "defender", Season(2022)
+    )
+    assert aho_forward != aho_defender
+
+    # by their type
+    (defender,) = registry.ids(
+        "puckpedia", [1], ["Sebastian Aho"], "defender", Season(2022)
+    )
+    (forward,) = registry.ids(
+        "puckpedia", [2], ["Sebastian Aho"], "forward", Season(2022)
+    )
+    assert (forward, defender) == (aho_forward, aho_defender)
+
+    # then by the season they're seen in
+    registry.ids(
+        "hockey_reference", ["murrama02"], ["Matt Murray"], "goalie", Season(2016)
+    )
+    older, younger = registry.ids(
+        "hockey_reference",
+        ["murrama02", "murrama03"],
+        ["Matt Murray", "Matt Murray"],
+        "goalie",
+        Season(2021),
+    )
+    assert older != younger
+    (puckpedia,) = registry.ids(
+        "puckpedia", [10], ["Matt Murray"], "goalie", Season(2016)
+    )
+    assert puckpedia == older
+
+    # when both are seen in the season, picking one of them could be wrong
+    with pytest.warns(UserWarning, match="Matt Murray"):
+        (marqueur,) = registry.ids(
+            "marqueur", ["Matt Murray"], ["Matt Murray"], "goalie", Season(2021)
+        )
+    assert marqueur not in (older, younger)
@@ -1,4 +1,7 @@
+import json
+
 from hockey_pool_picker.core.season import Season
+from hockey_pool_picker.sources import puckpedia
 from hockey_pool_picker.sources.puckpedia import PuckpediaStatsAndCapHitSource
 
 
@@ -19,3 +22,42 @@ def test_2022():
     assert player["name"] == "Alex Chiasson"
     assert player["pos"] == "R"
     assert player["cap_hit"] == 750_000
+
+
+def write_dump(path, players):
+    with open(path, "w") as file:
+        json.dump({"data": {"p": players}}, file)
+
+
+def test_read_to_df_keeps_used_columns(tmp_path, monkeypatch):
+    monkeypatch.setattr(puckpedia, "base_dir", tmp_path)
+    folder = tmp_path / "data" / "puckpedia" / "manual" / "1990-1991" / "skaters"
+    folder.mkdir(parents=True)
+    player = {
+        "p_id": 1,
+        "p_fn": "Connor",
+        "p_ln": "McDavid",
+        "p_url": "connor-mcdavid",
+        "pos": "C",
+        "cap_hit": "$12,500,000",
+        "st_gp": "82",
+        "st_g": "64",
+        "team": {"name": "Edmonton"},
+    }
+    # dumps hold players either as a list or as a dict
+    write_dump(folder / "1.json", [player])
+    write_dump(folder / "2.json", {"0": {**player, "p_id": 2, "cap_hit": "$750,000"}})
+
+    df = PuckpediaStatsAndCapHitSource(Season(start=1990)).read_to_df("skaters")
+
+    assert set(df.columns) == {
+        "p_id",
+        "p_fn",
+        "p_ln",
+        "p_url",
+        "pos",
+        "cap_hit",
+        "st_gp",
+        "st_g",
+    }
+    assert df["cap_hit"].to_list() == [12_500_000, 750_000]
@@ -0,0 +1,25 @@
+import pandas as pd
+
+from hockey_pool_picker.core.season import Season
+from hockey_pool_picker.sources import season_cache
+
+
+def test_loads_once_until_invalidated():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return pd.DataFrame({"name": ["A"]})
+
+    season, other_season = Season(start=1990), Season(start=1991)
+    first = season_cache.load(season, "players", loader)
+    assert season_cache.load(season, "players", loader) is first
+    season_cache.load(other_season, "players", loader)
+    assert len(calls) == 2
+
+    season_cache.invalidate(season)
+    season_cache.load(season, "players", loader)
+    season_cache.load(other_season, "players", loader)
+    assert len(calls) == 3
+
+    season_cache.invalidate()
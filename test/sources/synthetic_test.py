@@ -0,0 +1,59 @@
+import pytest
+
+from hockey_pool_picker.core.game_events import GameEvents
+from hockey_pool_picker.core.season import Season
+from hockey_pool_picker.core.strategy import MarqueurValueStrategy
+from hockey_pool_picker.sources import player_registry, season_cache
+from hockey_pool_picker.sources.backtest import BacktestingSource
+from hockey_pool_picker.sources.data_dir import ENVIRONMENT_VARIABLE
+from hockey_pool_picker.sources.games.hockey_reference import (
+    HockeyReferenceGamesSource,
+)
+from hockey_pool_picker.sources.players import PlayersSource
+from hockey_pool_picker.sources.synthetic import SyntheticLeague
+
+
+@pytest.fixture
+def league(tmp_path, monkeypatch):
+    monkeypatch.setenv(ENVIRONMENT_VARIABLE, str(tmp_path))
+    monkeypatch.setattr(player_registry, "_registry", None)
+    season_cache.invalidate()
+
+    SyntheticLeague(forwards=60, defenders=30, goalies=8, games=120).write(
+        tmp_path, [2021, 2022]
+    )
+    yield tmp_path
+
+    season_cache.invalidate()
+
+
+def test_generated_seasons_load_through_sources(league):
+    strategy = MarqueurValueStrategy()
+    past_pool, present_pool = BacktestingSource(Season(2021), PlayersSource).load(
+        strategy, strategy
+    )
+
+    for past_players, present_players in zip(past_pool, present_pool):
+        assert not past_players.empty
+        assert past_players["player_id"].equals(present_players["player_id"])
+        assert (past_players["weight"] > 0).all()
+
+
+def test_season_stats_add_up_to_games(league):
+    games = HockeyReferenceGamesSource(Season(2022)).load()
+    events = GameEvents(games)
+    assert events.key == "player_code"
+
+    players = PlayersSource(Season(2022)).load("forward").set_index("player_code")
+    goals = events.goals.groupby("player_code").size()
+    assert (players["goals"] == goals.reindex(players.index, fill_value=0)).all()
+
+
+def test_player_ids_are_stable_across_runs(league, monkeypatch):
+    ids = PlayersSource(Season(2022)).load("defender")["player_id"]
+    assert player_registry.registry().file.exists()
+
+    # a later run loading seasons in another order
+    monkeypatch.setattr(player_registry, "_registry", None)
+    PlayersSource(Season(2021)).load("goalie")
+    assert PlayersSource(Season(2022)).load("defender")["player_id"].equals(ids)
@@ -32,7 +32,7 @@ def test_load_hockey_reference_games():
         source = HockeyReferenceGamesSource(season)
         dataframe = source.load()
         assert len(dataframe) > 0
-        assert list(dataframe.columns) == ["date", "scores", "goalies"]
+        assert {"date", "scores", "goalies"}.issubset(dataframe.columns)
 
 
 def test_load_marqueur():
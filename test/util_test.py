@@ -0,0 +1,15 @@
+from hockey_pool_picker.util import normalize_name, normalize_names
+
+
+def test_normalize_names_matches_normalize_name():
+    names = [
+        "Connor McDavid",
+        "Mitchell Marner",
+        "Simon Holmstom",
+        "Tim Stützle",
+        "J.J. Moser",
+        "Ryan O'Reilly",
+        "Connor McDavid",
+    ]
+
+    assert normalize_names(names).to_list() == [normalize_name(name) for name in names]